@@ -7,10 +7,70 @@ Automated script to build standalone applications for Mac and Windows using PyIn
 
 import os
 import sys
+import json
+import argparse
+import hashlib
+import functools
+import glob
+import threading
 import subprocess
 import shutil
 from pathlib import Path
 import platform
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+CONDA_PREFIX = os.environ.get('CONDA_PREFIX')
+
+# Per-user cache for results that only depend on the Python interpreter
+BUILD_CACHE_DIR = Path.home() / ".cache" / "relevantr-build"
+ENV_CACHE_FILE = BUILD_CACHE_DIR / "env.json"
+
+# Child processes output to our pipes, so they don't need their own console
+SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+
+# Heavy packages Relevantr never imports; keeping them out shrinks the bundle
+EXCLUDED_MODULES = [
+    'matplotlib',
+    'scipy',
+    'numpy.f2py',
+    'IPython',
+    'notebook',
+    'pytest',
+    'sphinx',
+    'pandas.tests',
+]
+
+def cached_env_probe(func):
+    """Cache a path-returning probe on disk, keyed by the running interpreter"""
+    @functools.wraps(func)
+    def wrapper():
+        key = hashlib.sha1(f"{sys.executable}|{sys.version_info}".encode()).hexdigest()
+        try:
+            with open(ENV_CACHE_FILE, "r", encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        
+        # A different interpreter invalidates every cached entry
+        if cache.get('key') != key:
+            cache = {'key': key}
+        
+        cached = cache.get(func.__name__)
+        if cached and os.path.exists(cached):
+            return cached
+        
+        result = func()
+        if result:
+            cache[func.__name__] = result
+            try:
+                BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(ENV_CACHE_FILE, "w", encoding='utf-8') as f:
+                    json.dump(cache, f, indent=2)
+            except OSError:
+                pass  # Caching is best effort
+        return result
+    return wrapper
 
 def check_pyinstaller():
     """Check if PyInstaller is installed"""
@@ -23,72 +83,158 @@ def check_pyinstaller():
         print("Install with: pip install pyinstaller")
         return False
 
-def clean_build_dirs():
+def run_logged(cmd, log_path="build.log", **kwargs):
+    """Run a command with its output streamed to a log file instead of memory"""
+    print(f"[LOG] Writing build output to {log_path}")
+    try:
+        with open(log_path, "w", encoding='utf-8') as log:
+            subprocess.run(cmd, check=True, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+    except subprocess.CalledProcessError:
+        print_log_tail(log_path)
+        raise
+
+def print_log_tail(log_path, lines=100):
+    """Print the last lines of a build log"""
+    try:
+        with open(log_path, "r", encoding='utf-8', errors='replace') as f:
+            tail = deque(f, maxlen=lines)
+    except OSError:
+        return
+    print(f"[LOG] Last {len(tail)} lines of {log_path}:")
+    print("".join(tail).rstrip())
+
+def optimized_build_env():
+    """Environment for PyInstaller that bundles docstring-free .opt-2.pyc files"""
+    return {**os.environ, 'PYTHONOPTIMIZE': '2'}
+
+def remove_stale_bytecode():
+    """Remove __pycache__ next to project sources so .opt-2.pyc files get regenerated"""
+    # Project sources live at the top level and in pyinstaller_hooks/
+    for cache_dir in [Path('__pycache__'), *Path('.').glob('*/__pycache__')]:
+        if cache_dir.parts[0] in ('build', 'dist'):
+            continue
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def write_atomic(path, data):
+    """Write bytes to a temp file and rename it into place"""
+    # Readers (PyInstaller, antivirus scanners) never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def write_spec(spec_path, spec_content):
+    """Write a generated spec file, skipping it when the content is unchanged"""
+    spec_hash = hashlib.sha256(spec_content.encode('utf-8')).hexdigest()
+    hash_path = Path(f"{spec_path}.hash")
+    
+    if (os.path.exists(spec_path) and hash_path.exists()
+            and hash_path.read_text(encoding='utf-8').strip() == spec_hash):
+        print(f"[SPEC] {spec_path} is up to date")
+        return False
+    
+    write_atomic(spec_path, spec_content.encode('utf-8'))
+    hash_path.write_text(spec_hash, encoding='utf-8')
+    print(f"[SPEC] Wrote {spec_path}")
+    return True
+
+def remove_tree(path, ignore_errors=False):
+    """Delete a directory tree, using cmd's rmdir on Windows where it is much faster"""
+    if sys.platform == 'win32':
+        subprocess.run(['cmd', '/c', 'rmdir', '/s', '/q', path], stdin=subprocess.DEVNULL,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       creationflags=SUBPROCESS_FLAGS)
+    # Falls back to (or finishes after) rmdir for anything left behind
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=ignore_errors)
+
+def remove_trees(paths, ignore_errors=False):
+    """Delete independent directory trees concurrently"""
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        list(executor.map(functools.partial(remove_tree, ignore_errors=ignore_errors), paths))
+
+def _remove_in_background(path):
+    """Delete a directory tree on a daemon thread"""
+    threading.Thread(target=shutil.rmtree, args=(path,), kwargs={'ignore_errors': True},
+                     daemon=True).start()
+
+def discard_tree(path):
+    """Move a directory tree out of the way and delete it in the background"""
+    # Renaming is instant; the large tree is deleted while PyInstaller runs
+    old_path = f'{path}.old-{os.getpid()}'
+    os.replace(path, old_path)
+    _remove_in_background(old_path)
+
+def remove_discarded_trees(path):
+    """Delete discard_tree() leftovers from runs that exited before it finished"""
+    for stale in glob.glob(f'{glob.escape(str(path))}.old-*'):
+        _remove_in_background(stale)
+
+def clean_build_dirs(full_clean=False):
     """Clean previous build directories"""
-    dirs_to_clean = ['build', 'dist', '__pycache__']
+    remove_discarded_trees('dist')
+    
+    # build/ holds PyInstaller's incremental cache (the Analysis TOC, PYZ and
+    # compiled bytecode), so it is kept unless a full rebuild is requested
+    dirs_to_clean = ['dist', '__pycache__']
+    if full_clean:
+        dirs_to_clean.insert(0, 'build')
     for dir_name in dirs_to_clean:
         if os.path.exists(dir_name):
             print(f"[CLEAN] Cleaning {dir_name}/")
-            shutil.rmtree(dir_name)
+            if dir_name == 'dist':
+                discard_tree(dir_name)
+            else:
+                shutil.rmtree(dir_name)
 
+@cached_env_probe
 def find_python_dll():
     """Find the Python DLL location for Windows"""
     if sys.platform == "win32":
-        python_dir = os.path.dirname(sys.executable)
         dll_name = f"python{sys.version_info.major}{sys.version_info.minor}.dll"
-        dll_paths = [
-            os.path.join(python_dir, dll_name),
-            os.path.join(python_dir, "DLLs", dll_name),
-            os.path.join(os.environ.get('CONDA_PREFIX', ''), dll_name),
-            os.path.join(os.environ.get('CONDA_PREFIX', ''), "Library", "bin", dll_name),
+        python_dir = Path(sys.executable).parent
+        env_root = Path(CONDA_PREFIX or sys.prefix)
+        search_roots = [
+            python_dir,
+            python_dir / "DLLs",
+            env_root,
+            env_root / "Library" / "bin",
         ]
         
-        for dll_path in dll_paths:
-            if os.path.exists(dll_path):
-                print(f"[OK] Found Python DLL: {dll_path}")
-                return dll_path
+        dll_path = next((p for root in search_roots for p in root.glob(dll_name)), None)
+        if dll_path:
+            print(f"[OK] Found Python DLL: {dll_path}")
+            return str(dll_path)
         
         print(f"[WARNING] Python DLL not found: {dll_name}")
         return None
     return None
 
-def build_app(platform_name="auto"):
-    """Build the application using PyInstaller"""
-    print(f"[BUILD] Building Relevantr for {platform_name}...")
-    
-    # Clean previous builds
-    clean_build_dirs()
-    
-    # Base command
-    cmd = [
-        'pyinstaller',
-        '--name=Relevantr',
-        '--windowed',  # No console window
-        '--onedir',    # Create directory bundle (more reliable than onefile)
-    ]
-    
-    # Platform-specific options
-    if sys.platform == "darwin":  # macOS
+def _platform_flags(platform_id):
+    """PyInstaller options specific to a sys.platform value"""
+    if platform_id == "darwin":  # macOS
         print("[PLATFORM] Building for macOS...")
-        cmd.extend([
+        return [
+            '--contents-directory=lib',  # Support files in lib/ (PyInstaller >= 6.2)
             '--add-data=environment.yml:.',
             '--add-data=requirements.txt:.',
             '--hidden-import=tkinter',
             '--hidden-import=PIL._tkinter_finder',
             '--collect-all=tkinter',
-        ])
-        
-    elif sys.platform == "win32":  # Windows
+        ]
+    
+    if platform_id == "win32":  # Windows
         print("[PLATFORM] Building for Windows...")
+        flags = []
         
         # Find and add Python DLL
         python_dll = find_python_dll()
         if python_dll:
-            cmd.extend([
-                f'--add-binary={python_dll};.',
-            ])
+            flags.append(f'--add-binary={python_dll};.')
         
-        cmd.extend([
+        flags.extend([
             '--add-data=environment.yml;.',
             '--add-data=requirements.txt;.',
             '--hidden-import=tkinter',
@@ -103,62 +249,68 @@ def build_app(platform_name="auto"):
             '--collect-submodules=langchain_google_genai',
             '--collect-submodules=chromadb',
             '--collect-data=chromadb',
-            '--exclude-module=matplotlib',
-            '--exclude-module=scipy',
-            '--exclude-module=numpy.f2py',
-        ])
-        
-    else:  # Linux
-        print("[PLATFORM] Building for Linux...")
-        cmd.extend([
-            '--add-data=environment.yml:.',
-            '--add-data=requirements.txt:.',
-            '--hidden-import=tkinter',
-            '--collect-all=tkinter',
         ])
+        return flags
+    
+    # Linux
+    print("[PLATFORM] Building for Linux...")
+    return [
+        '--contents-directory=lib',
+        '--add-data=environment.yml:.',
+        '--add-data=requirements.txt:.',
+        '--hidden-import=tkinter',
+        '--collect-all=tkinter',
+    ]
+
+def _check_vcredist():
+    """Report whether Visual C++ redistributables are available (Windows)"""
+    print("[POST-BUILD] Performing Windows post-build steps...")
+    
+    vcredist_paths = [
+        "C:\\Program Files\\Microsoft Visual Studio\\2022\\BuildTools\\VC\\Redist\\MSVC",
+        "C:\\Program Files (x86)\\Microsoft Visual Studio\\14.0\\VC\\redist"
+    ]
+    
+    for vcredist_path in vcredist_paths:
+        if os.path.exists(vcredist_path):
+            print(f"[INFO] Visual C++ redistributables found at: {vcredist_path}")
+            break
+    else:
+        print("[INFO] Consider installing Visual C++ redistributables for broader compatibility")
+
+def build_app(platform_name="auto", full_clean=False):
+    """Build the application using PyInstaller"""
+    print(f"[BUILD] Building Relevantr for {platform_name}...")
+    clean_build_dirs(full_clean)
     
-    # Add the main script
-    cmd.append('relevantr.py')
+    cmd = [
+        'pyinstaller',
+        '--noconfirm',
+        '--name=Relevantr',
+        '--windowed',  # No console window
+        '--onedir',    # Create directory bundle (more reliable than onefile)
+        *(f'--exclude-module={module}' for module in EXCLUDED_MODULES),
+        *_platform_flags(sys.platform),
+        'relevantr.py',
+    ]
     
     try:
         print(f"[CMD] Running command: {' '.join(cmd)}")
-        # Run PyInstaller
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        remove_stale_bytecode()
+        run_logged(cmd, env=optimized_build_env())
         print("[OK] Build completed successfully!")
+        print(f"[RESULT] Application built in: {(Path('dist') / 'Relevantr').absolute()}")
         
-        # Show build location
-        dist_path = Path("dist") / "Relevantr"
-        print(f"[RESULT] Application built in: {dist_path.absolute()}")
-        
-        # Windows-specific post-build steps
         if sys.platform == "win32":
-            print("[POST-BUILD] Performing Windows post-build steps...")
-            
-            # Copy Visual C++ redistributables if available
-            vcredist_paths = [
-                "C:\\Program Files\\Microsoft Visual Studio\\2022\\BuildTools\\VC\\Redist\\MSVC",
-                "C:\\Program Files (x86)\\Microsoft Visual Studio\\14.0\\VC\\redist"
-            ]
-            
-            for vcredist_path in vcredist_paths:
-                if os.path.exists(vcredist_path):
-                    print(f"[INFO] Visual C++ redistributables found at: {vcredist_path}")
-                    break
-            else:
-                print("[INFO] Consider installing Visual C++ redistributables for broader compatibility")
-        
+            _check_vcredist()
         return True
         
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Build failed: {e}")
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
+        print("[INFO] Full output in build.log")
         return False
 
-def create_windows_batch_file():
-    """Create a batch file launcher for Windows"""
-    if sys.platform == "win32":
-        batch_content = """@echo off
+_BATCH_TEMPLATE = """@echo off
 echo Starting Relevantr...
 cd /d "%~dp0"
 Relevantr.exe
@@ -174,14 +326,10 @@ if errorlevel 1 (
     pause
 )
 """
-        batch_path = Path("dist") / "Relevantr" / "Start_Relevantr.bat"
-        with open(batch_path, "w", encoding='ascii', errors='replace') as f:
-            f.write(batch_content)
-        print("[OK] Created Windows batch launcher: Start_Relevantr.bat")
+# Encoded once at import (CRLF, as cmd.exe expects); the launcher never changes
+_BATCH_BYTES = _BATCH_TEMPLATE.replace('\n', '\r\n').encode('ascii', 'replace')
 
-def create_installer_info():
-    """Create installation instructions"""
-    instructions = f"""
+_INSTALL_TEMPLATE = """
 # Relevantr Standalone Application - Installation Guide
 
 ## System Requirements
@@ -200,7 +348,7 @@ def create_installer_info():
 
 ## macOS Installation:
 1. Extract the downloaded file
-2. Right-click Relevantr -> "Open" (to bypass Gatekeeper)
+2. Right-click Relevantr.app -> "Open" (to bypass Gatekeeper)
 3. If prompted, allow network access for API calls
 
 ## First Time Setup:
@@ -214,6 +362,7 @@ def create_installer_info():
 - **"python312.dll not found"**: Install Visual C++ Redistributables
 - **Antivirus blocking**: Add Relevantr folder to exclusions
 - **Slow startup**: Normal for first run, subsequent starts are faster
+  (the app runs directly from its folder, nothing is unpacked on launch)
 - **API errors**: Check your Google Gemini API key
 
 ## Notes:
@@ -221,16 +370,36 @@ def create_installer_info():
 - Your API key is stored securely in environment variables
 - Vector database persists between sessions
 
-Built with Python {sys.version_info.major}.{sys.version_info.minor} on {platform.platform()}
+Built with Python {python_version} on {build_platform}
 """
-    
-    with open("INSTALLATION.md", "w", encoding='utf-8') as f:
-        f.write(instructions)
-    
+
+@functools.lru_cache(maxsize=None)
+def _render_installation_guide():
+    """INSTALLATION.md contents for this interpreter and platform"""
+    return _INSTALL_TEMPLATE.format(
+        python_version=f"{sys.version_info.major}.{sys.version_info.minor}",
+        build_platform=platform.platform(),
+    ).encode('utf-8')
+
+def create_windows_batch_file():
+    """Create a batch file launcher for Windows"""
+    if sys.platform == "win32":
+        batch_path = Path("dist") / "Relevantr" / "Start_Relevantr.bat"
+        batch_path.write_bytes(_BATCH_BYTES)
+        print("[OK] Created Windows batch launcher: Start_Relevantr.bat")
+
+def create_installer_info():
+    """Create installation instructions"""
+    Path("INSTALLATION.md").write_bytes(_render_installation_guide())
     print("[OK] Created INSTALLATION.md with setup instructions")
 
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Build Relevantr with PyInstaller")
+    parser.add_argument('--clean', action='store_true',
+                        help="Also remove build/ (PyInstaller cache) for a full rebuild")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("Relevantr Build Process")
     print("=" * 50)
@@ -245,7 +414,7 @@ def main():
         sys.exit(1)
     
     # Build the application
-    if build_app(platform.system()):
+    if build_app(platform.system(), full_clean=args.clean):
         create_installer_info()
         
         # Windows-specific post-build
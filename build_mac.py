@@ -6,11 +6,78 @@ Handles ChromaDB and other macOS-specific packaging issues
 
 import os
 import sys
+import argparse
+import hashlib
+import importlib.util
+import concurrent.futures
 import subprocess
-import shutil
 from pathlib import Path
 import site
 
+from build_app import (
+    BUILD_CACHE_DIR,
+    EXCLUDED_MODULES,
+    cached_env_probe,
+    clean_build_dirs,
+    optimized_build_env,
+    remove_stale_bytecode,
+    run_logged,
+    write_spec,
+)
+
+# Pre-generated hooks replacing the slow --collect-all=<pkg> flags
+HOOKS_DIR = 'pyinstaller_hooks'
+
+# Generated once from mac_build_options() and reused by later builds
+MAC_SPEC_FILE = 'relevantr_mac.spec'
+
+MAC_SPEC_TEMPLATE = """# -*- mode: python ; coding: utf-8 -*-
+# Generated by build_mac.py - edit mac_build_options() there instead
+
+a = Analysis(
+    ['relevantr.py'],
+    pathex=[],
+    binaries=[],
+    datas={datas},
+    hiddenimports={hiddenimports},
+    hookspath={hookspath},
+    hooksconfig={{}},
+    runtime_hooks=[],
+    excludes={excludes},
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Relevantr',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    contents_directory='lib',
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='Relevantr',
+)
+"""
+
+@cached_env_probe
 def get_site_packages():
     """Get the site-packages directory"""
     site_packages = site.getsitepackages()
@@ -28,28 +95,113 @@ def check_chromadb_modules():
     """Check which ChromaDB modules are available"""
     print("[CHECK] Verifying ChromaDB installation...")
     
+    # Locate chromadb without importing it; the marker is keyed by its
+    # location and mtime, so reinstalling or upgrading triggers a new check
+    spec = importlib.util.find_spec('chromadb')
+    if spec is None or not spec.origin:
+        print("[ERROR] Missing ChromaDB module: chromadb")
+        return False
+    
+    chromadb_dir = os.path.dirname(spec.origin)
+    key = hashlib.sha1((chromadb_dir + str(os.path.getmtime(spec.origin))).encode()).hexdigest()
+    marker = BUILD_CACHE_DIR / f"chromadb.{key}.ok"
+    if marker.exists():
+        print("[OK] All ChromaDB modules found (cached)")
+        return True
+    
     try:
         import chromadb
         import chromadb.telemetry
         import chromadb.telemetry.product
         import chromadb.telemetry.product.posthog
         print("[OK] All ChromaDB modules found")
-        return True
     except ImportError as e:
         print(f"[ERROR] Missing ChromaDB module: {e}")
         return False
+    
+    try:
+        BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass  # Caching is best effort
+    return True
+
+def mac_build_options(site_pkg):
+    """PyInstaller options for the macOS directory build"""
+    return {
+        'datas': [
+            # Data files
+            ('environment.yml', '.'),
+            ('requirements.txt', '.'),
+            
+            # Package sources
+            (f'{site_pkg}/chromadb', 'chromadb'),
+            (f'{site_pkg}/google', 'google'),
+            (f'{site_pkg}/langchain', 'langchain'),
+            (f'{site_pkg}/langchain_community', 'langchain_community'),
+            (f'{site_pkg}/langchain_google_genai', 'langchain_google_genai'),
+        ],
+        'hiddenimports': [
+            # ChromaDB
+            'chromadb',
+            
+            # Google AI
+            'google.generativeai',
+            
+            # Core dependencies (tkinter data is handled by PyInstaller's own hook)
+            'tkinter',
+            'tkinter.ttk',
+            'tkinter.filedialog',
+            'tkinter.messagebox',
+            'tkinter.scrolledtext',
+            
+            # PDF processing
+            'fitz',
+            'pymupdf',
+            
+            # Utilities
+            'tqdm',
+            'dotenv',
+            
+            # Additional ChromaDB dependencies that might be missing
+            'posthog',
+            'segment_analytics_python',
+            'overrides',
+            'typing_extensions',
+            'pydantic',
+            'sqlite3',
+        ],
+        # Cached collect-all hooks for chromadb, google, langchain*,
+        # pymupdf and tqdm (see pyinstaller_hooks/)
+        'hookspath': [HOOKS_DIR],
+        # Known-unused heavy packages
+        'excludes': list(EXCLUDED_MODULES),
+    }
 
-def build_mac_app():
+def _isolated_env(target, env):
+    """env with a PyInstaller config directory (and so binCache) of target's own"""
+    # The directory and .app builds run concurrently, and two PyInstaller
+    # processes sharing one binCache corrupt each other's builds
+    config_dir = BUILD_CACHE_DIR / 'pyi-config' / target
+    config_dir.mkdir(parents=True, exist_ok=True)
+    return {**env, 'PYINSTALLER_CONFIG_DIR': str(config_dir)}
+
+def _run_spec(spec_path, workpath, distpath):
+    """Run PyInstaller on a spec file"""
+    cmd = [
+        'pyinstaller',
+        '--noconfirm',
+        f'--workpath={workpath}',
+        f'--distpath={distpath}',
+        spec_path,
+    ]
+    print(f"[CMD] Running PyInstaller...")
+    run_logged(cmd, "build.log", env=_isolated_env('app', optimized_build_env()))
+
+def build_mac_app(workpath="build/app", distpath="dist"):
     """Build macOS application with comprehensive ChromaDB support"""
     print("[BUILD] Building Relevantr for macOS...")
     
-    # Clean previous builds
-    dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            print(f"[CLEAN] Removing {dir_name}/")
-            shutil.rmtree(dir_name)
-    
     # Get site-packages path
     site_pkg = get_site_packages()
     if not site_pkg:
@@ -58,129 +210,75 @@ def build_mac_app():
     
     print(f"[INFO] Using site-packages: {site_pkg}")
     
-    # Build command with comprehensive ChromaDB inclusion
-    cmd = [
-        'pyinstaller',
-        '--windowed',
-        '--onedir',
-        '--name=Relevantr',
-        
-        # Add data files
-        '--add-data=environment.yml:.',
-        '--add-data=requirements.txt:.',
-        
-        # ChromaDB - COMPREHENSIVE INCLUSION
-        f'--add-data={site_pkg}/chromadb:chromadb',
-        '--hidden-import=chromadb',
-        '--hidden-import=chromadb.config',
-        '--hidden-import=chromadb.utils',
-        '--hidden-import=chromadb.api',
-        '--hidden-import=chromadb.db',
-        '--hidden-import=chromadb.db.impl',
-        '--hidden-import=chromadb.telemetry',
-        '--hidden-import=chromadb.telemetry.product',
-        '--hidden-import=chromadb.telemetry.product.posthog',
-        '--hidden-import=chromadb.segment',
-        '--collect-all=chromadb',
-        
-        # Google AI
-        f'--add-data={site_pkg}/google:google',
-        '--hidden-import=google',
-        '--hidden-import=google.generativeai',
-        '--collect-all=google',
-        '--collect-all=google.generativeai',
-        
-        # LangChain
-        f'--add-data={site_pkg}/langchain:langchain',
-        f'--add-data={site_pkg}/langchain_community:langchain_community',
-        f'--add-data={site_pkg}/langchain_google_genai:langchain_google_genai',
-        '--collect-all=langchain',
-        '--collect-all=langchain_community',
-        '--collect-all=langchain_google_genai',
-        
-        # Core dependencies
-        '--hidden-import=tkinter',
-        '--hidden-import=tkinter.ttk',
-        '--hidden-import=tkinter.filedialog',
-        '--hidden-import=tkinter.messagebox',
-        '--hidden-import=tkinter.scrolledtext',
-        '--collect-all=tkinter',
-        
-        # PDF processing
-        '--hidden-import=fitz',
-        '--collect-all=pymupdf',
-        
-        # Utilities
-        '--hidden-import=tqdm',
-        '--hidden-import=dotenv',
-        '--collect-all=tqdm',
-        
-        # Additional ChromaDB dependencies that might be missing
-        '--hidden-import=posthog',
-        '--hidden-import=segment_analytics_python',
-        '--hidden-import=overrides',
-        '--hidden-import=typing_extensions',
-        '--hidden-import=pydantic',
-        '--hidden-import=sqlite3',
-        
-        # Main script
-        'relevantr.py'
-    ]
-    
     try:
-        print(f"[CMD] Running PyInstaller...")
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        options = mac_build_options(site_pkg)
+        write_spec(MAC_SPEC_FILE, MAC_SPEC_TEMPLATE.format(**{k: repr(v) for k, v in options.items()}))
+        _run_spec(MAC_SPEC_FILE, workpath, distpath)
         print("[OK] Build completed successfully!")
         
         # Show build location
-        app_path = Path("dist/Relevantr")
+        app_path = Path(distpath) / "Relevantr"
         print(f"[RESULT] Application built in: {app_path.absolute()}")
         
         return True
         
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Build failed: {e}")
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
+        print("[INFO] Full output in build.log")
         return False
 
-def create_app_bundle():
+def create_app_bundle(workpath="build/bundle", distpath="dist/bundle"):
     """Create a proper macOS .app bundle"""
     print("[BUNDLE] Creating macOS .app bundle...")
     
     try:
-        # Use --onefile for proper .app creation
+        # Use --onedir so the bundle is not re-extracted to a temp dir on every launch
         cmd = [
             'pyinstaller',
+            '--noconfirm',
             '--windowed',
-            '--onefile',  # Creates .app bundle
+            '--onedir',
+            '--contents-directory=lib',  # Keep support files in lib/ (PyInstaller >= 6.2)
             '--name=Relevantr',
+            f'--workpath={workpath}',
+            f'--distpath={distpath}',
             '--icon=assets/icon.icns',  # Add icon if available
+            '--osx-bundle-identifier=org.relevantr.Relevantr',
             
-            # Same comprehensive includes as above
-            '--collect-all=chromadb',
-            '--collect-all=google',
-            '--collect-all=langchain',
-            '--collect-all=langchain_community',
-            '--collect-all=langchain_google_genai',
+            # Same cached collect-all hooks as above
+            f'--additional-hooks-dir={HOOKS_DIR}',
             
             # Add the most critical missing modules
-            '--hidden-import=chromadb.telemetry.product.posthog',
             '--hidden-import=posthog',
             
+            # Same known-unused heavy packages as the directory build
+            *(f'--exclude-module={module}' for module in EXCLUDED_MODULES),
+            
             'relevantr.py'
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print("[OK] .app bundle created: dist/Relevantr.app")
+        # Separate log so it can run alongside build_mac_app; optimized like
+        # the directory build, so both outputs are packaged the same way
+        run_logged(cmd, "build_bundle.log", env=_isolated_env('bundle', optimized_build_env()))
+        
+        # --windowed --onedir makes PyInstaller emit a self-contained .app
+        # with the onedir files inside Contents/, ready for codesigning
+        app_path = Path(distpath) / "Relevantr.app"
+        print(f"[OK] .app bundle created: {app_path}")
         return True
         
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] App bundle creation failed: {e}")
+        print("[INFO] Full output in build_bundle.log")
         return False
 
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Build Relevantr for macOS")
+    parser.add_argument('--clean', action='store_true',
+                        help="Also remove build/ (PyInstaller cache) for a full rebuild")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Relevantr macOS Build Script")
     print("=" * 60)
@@ -195,17 +293,30 @@ def main():
         print("pip install chromadb")
         sys.exit(1)
     
-    # Build directory version first
-    if build_mac_app():
+    # Ask up front so both PyInstaller runs can start together
+    create_bundle = input("\nCreate .app bundle? (y/n): ").lower().strip().startswith('y')
+    
+    clean_build_dirs(full_clean=args.clean)
+    remove_stale_bytecode()
+    
+    # Each build gets its own workpath/distpath, so the two PyInstaller
+    # processes can run side by side on separate cores
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        app_future = executor.submit(build_mac_app)
+        bundle_future = executor.submit(create_app_bundle) if create_bundle else None
+        concurrent.futures.wait([f for f in (app_future, bundle_future) if f])
+    
+    if app_future.result():
         print("\n[SUCCESS] Directory version built successfully!")
         
-        # Ask if user wants .app bundle
-        create_bundle = input("\nCreate .app bundle? (y/n): ").lower().strip()
-        if create_bundle.startswith('y'):
-            create_app_bundle()
-        
         print("\n[INFO] Build complete!")
         print("[INFO] Test the app from: dist/Relevantr/Relevantr")
+        print("[INFO] Support files live in: dist/Relevantr/lib")
+        if bundle_future:
+            if bundle_future.result():
+                print("[INFO] App bundle: dist/bundle/Relevantr.app")
+            else:
+                print("[WARNING] .app bundle creation failed")
     else:
         print("\n[FAILED] Build process failed!")
         sys.exit(1)
@@ -6,72 +6,30 @@ Includes additional debugging and dependency fixes
 
 import os
 import sys
+import re
+import json
+import argparse
+import hashlib
 import subprocess
-import shutil
+import tempfile
+import importlib.metadata
+import importlib.util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-def check_environment():
-    """Check if we're in the right environment with additional Windows checks"""
-    print("[CHECK] Verifying environment...")
-    
-    # Check if we're in conda
-    conda_prefix = os.environ.get('CONDA_PREFIX')
-    if conda_prefix:
-        print(f"[OK] Using conda environment: {conda_prefix}")
-    else:
-        print("[WARNING] Not in a conda environment")
-    
-    # Check Python version
-    python_version = sys.version_info
-    if python_version >= (3, 11):
-        print(f"[OK] Python {python_version.major}.{python_version.minor}.{python_version.micro}")
-    else:
-        print(f"[WARNING] Python {python_version.major}.{python_version.minor}.{python_version.micro} - Python 3.11+ recommended")
-    
-    # Check critical imports with more detailed error reporting
-    critical_modules = {
-        'tkinter': 'Built into Python',
-        'google.generativeai': 'google-generativeai',
-        'langchain': 'langchain',
-        'langchain_community': 'langchain-community',
-        'langchain_google_genai': 'langchain-google-genai',
-        'chromadb': 'chromadb',
-        'fitz': 'pymupdf',
-        'tqdm': 'tqdm',
-        'dotenv': 'python-dotenv'
-    }
-    
-    missing = []
-    
-    for module, package in critical_modules.items():
-        try:
-            imported_module = __import__(module)
-            version = getattr(imported_module, '__version__', 'unknown')
-            print(f"[OK] {module} available (version: {version})")
-        except ImportError as e:
-            print(f"[ERROR] {module} missing: {e}")
-            missing.append(package)
-    
-    # Check PyInstaller
-    try:
-        import PyInstaller
-        print(f"[OK] PyInstaller {PyInstaller.__version__} available")
-    except ImportError:
-        print("[ERROR] PyInstaller not installed")
-        missing.append('pyinstaller')
-    
-    if missing:
-        print(f"[ERROR] Missing packages: {missing}")
-        print("Install with: pip install " + " ".join(missing))
-        return False
-    
-    return True
+from build_app import (
+    BUILD_CACHE_DIR,
+    SUBPROCESS_FLAGS,
+    remove_trees,
+    write_atomic,
+    write_spec,
+)
 
-def create_enhanced_spec():
-    """Create an enhanced spec file with Windows-specific fixes"""
-    print("[SPEC] Creating enhanced Windows spec file...")
-    
-    spec_content = """# -*- mode: python ; coding: utf-8 -*-
+# Rewritten only when WINDOWS_SPEC_TEMPLATE changes (see build_app.write_spec)
+WINDOWS_SPEC_FILE = 'relevantr_windows.spec'
+
+WINDOWS_SPEC_TEMPLATE = """# -*- mode: python ; coding: utf-8 -*-
 
 import sys
 import os
@@ -80,10 +38,11 @@ import os
 
 block_cipher = None
 
-# Enhanced hidden imports for Windows
+# Hidden imports: only modules PyInstaller cannot see statically. Everything
+# relevantr.py imports directly (tkinter, langchain, tqdm, dotenv, ...) and
+# their regular dependencies are found by the import graph on their own
 hidden_imports = [
-    # Core AI dependencies
-    'google.generativeai',
+    # Google AI (loaded through protobuf/grpc plugin machinery)
     'google.ai.generativelanguage',
     'google.protobuf',
     'google.auth',
@@ -91,79 +50,29 @@ hidden_imports = [
     'grpc',
     'grpc._channel',
     
-    # LangChain ecosystem
-    'langchain',
-    'langchain_community',
-    'langchain_community.document_loaders',
+    # LangChain lazy exports (resolved through module __getattr__)
     'langchain_community.document_loaders.pdf',
-    'langchain_community.vectorstores',
     'langchain_community.vectorstores.chroma',
-    'langchain_google_genai',
     'langchain_core',
-    'langchain.text_splitter',
     
-    # ChromaDB and dependencies
+    # ChromaDB, imported lazily by the Chroma vector store (its
+    # submodules are added below)
     'chromadb',
-    'chromadb.config',
-    'chromadb.utils',
-    'chromadb.api',
-    'sqlite3',
     'hnswlib',
     
-    # PDF processing
+    # PDF processing, imported lazily by PyMuPDFLoader
     'fitz',
     'pymupdf',
     
-    # Standard library modules that might need explicit inclusion
-    'tkinter',
-    'tkinter.ttk',
-    'tkinter.filedialog',
-    'tkinter.messagebox',
-    'tkinter.scrolledtext',
-    'json',
-    'threading',
-    'logging',
-    'traceback',
-    'dataclasses',
-    'datetime',
-    'pathlib',
-    'uuid',
-    
-    # Utilities
-    'tqdm',
-    'dotenv',
-    'requests',
-    'urllib3',
-    'certifi',
-    'packaging',
-    
-    # Additional dependencies that might be missing
-    'numpy',
-    'typing_extensions',
-    'pydantic',
+    # Compiled extension modules
     'pydantic_core',
-    'tenacity',
-    'charset_normalizer',
-    'idna',
 ]
 
-# Data files and binaries
-datas = []
-
-# Add any necessary data files
-# Try to find and include important data files
-try:
-    import chromadb
-    chromadb_path = os.path.dirname(chromadb.__file__)
-    # Include chromadb data files if they exist
-    for root, dirs, files in os.walk(chromadb_path):
-        for file in files:
-            if file.endswith(('.json', '.yaml', '.yml', '.txt')):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, chromadb_path)
-                datas.append((full_path, f'chromadb/{rel_path}'))
-except:
-    pass
+# Submodules collected by build_windows.py when this spec is generated
+hidden_imports += {collected_imports}
+
+# Data files, collected by build_windows.py when this spec is generated
+datas = {datas}
 
 # Exclude problematic packages
 excludes = [
@@ -177,6 +86,17 @@ excludes = [
     'pip',
     'wheel',
     'conda',
+    
+    # Test suites and developer tooling
+    'tests',
+    'test',
+    'doctest',
+    'lib2to3',
+    'distutils',
+    'pkg_resources._vendor',
+    'setuptools._vendor',
+    'babel',
+    'sphinx',
 ]
 
 a = Analysis(
@@ -186,7 +106,7 @@ a = Analysis(
     datas=datas,
     hiddenimports=hidden_imports,
     hookspath=[],
-    hooksconfig={},
+    hooksconfig={{}},
     runtime_hooks=[],
     excludes=excludes,
     win_no_prefer_redirects=False,
@@ -195,6 +115,14 @@ a = Analysis(
     noarchive=False,
 )
 
+# Runtime DLLs that UPX tends to corrupt or get flagged by antivirus
+upx_exclude = [
+    'vcruntime140.dll',
+    'vcruntime140_1.dll',
+    'python3.dll',
+    'python%d%d.dll' % sys.version_info[:2],
+]
+
 # Remove duplicates
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
@@ -223,99 +151,266 @@ coll = COLLECT(
     a.datas,
     strip=False,
     upx=True,
-    upx_exclude=[],
+    upx_exclude=upx_exclude,
     name='Relevantr',
 )
 """
+
+# Appended to WINDOWS_SPEC_TEMPLATE unless the debug build is disabled
+WINDOWS_DEBUG_SPEC_TEMPLATE = """
+# Console debug build from the same Analysis, so dependencies are only scanned once
+debug_exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Relevantr_Debug',
+    debug=True,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # Not shipped, so not worth the compression time
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+debug_coll = COLLECT(
+    debug_exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='Relevantr_Debug',
+)
+"""
+
+# PyInstaller output echoed while building, and how much is kept for errors
+BUILD_PROGRESS_PATTERN = re.compile(r'ERROR|Analyzing|Building')
+BUILD_OUTPUT_TAIL = 500
+
+# Packages that import their own submodules from strings at runtime, so
+# PyInstaller's import graph cannot see them
+COLLECTED_PACKAGES = ['chromadb']
+HIDDEN_IMPORTS_CACHE = BUILD_CACHE_DIR / "hidden_imports.json"
+
+CHROMADB_DATA_SUFFIXES = frozenset({'.json', '.yaml', '.yml', '.txt'})
+
+BUILTIN_PACKAGE = 'Built into Python'
+
+# Module -> package for every dependency check_environment() can verify
+CRITICAL_MODULES = {
+    'tkinter': BUILTIN_PACKAGE,
+    'google.generativeai': 'google-generativeai',
+    'langchain': 'langchain',
+    'langchain_community': 'langchain-community',
+    'langchain_google_genai': 'langchain-google-genai',
+    'chromadb': 'chromadb',
+    'fitz': 'pymupdf',
+    'tqdm': 'tqdm',
+    'dotenv': 'python-dotenv',
+    'PyInstaller': 'pyinstaller',
+}
+
+# Checked by default; test_imports() covers the rest of the runtime imports
+FAST_CHECK_MODULES = ['tkinter', 'chromadb', 'google.generativeai', 'PyInstaller']
+
+# Modules exercised by test_imports(), with their display names
+IMPORT_TESTS = {
+    'tkinter': 'tkinter',
+    'google.generativeai': 'google.generativeai',
+    'langchain_community.document_loaders': 'langchain_community',
+    'chromadb': 'chromadb',
+    'fitz': 'PyMuPDF',
+}
+
+def _probe_module(module):
+    """Import a module (in a worker process) and return its version"""
+    imported_module = importlib.import_module(module)
+    return getattr(imported_module, '__version__', 'unknown')
+
+def _installed_version(module, package):
+    """Version of an installed package, read from its metadata without importing it"""
+    if package == BUILTIN_PACKAGE:
+        if importlib.util.find_spec(module) is None:
+            raise ModuleNotFoundError(f"No module named '{module}'")
+        return 'built-in'
+    # PackageNotFoundError is an ImportError
+    return importlib.metadata.version(package)
+
+def check_environment(full=False):
+    """Check if we're in the right environment with additional Windows checks"""
+    print("[CHECK] Verifying environment...")
     
-    with open("relevantr_windows.spec", "w") as f:
-        f.write(spec_content)
+    # Check if we're in conda
+    conda_prefix = os.environ.get('CONDA_PREFIX')
+    if conda_prefix:
+        print(f"[OK] Using conda environment: {conda_prefix}")
+    else:
+        print("[WARNING] Not in a conda environment")
+    
+    # Check Python version
+    python_version = sys.version_info
+    if python_version >= (3, 11):
+        print(f"[OK] Python {python_version.major}.{python_version.minor}.{python_version.micro}")
+    else:
+        print(f"[WARNING] Python {python_version.major}.{python_version.minor}.{python_version.micro} - Python 3.11+ recommended")
+    
+    # Package metadata is enough here; test_imports() does the real imports.
+    # The default check stops at the first missing module; full=True lists them all
+    modules = (CRITICAL_MODULES if full
+               else {module: CRITICAL_MODULES[module] for module in FAST_CHECK_MODULES})
+    missing = []
+    
+    for module, package in modules.items():
+        try:
+            version = _installed_version(module, package)
+            print(f"[OK] {module} available (version: {version})")
+        except ImportError:
+            print(f"[ERROR] {module} missing ({package} not installed)")
+            missing.append(package)
+            if not full:
+                break
+    
+    if missing:
+        print(f"[ERROR] Missing packages: {missing}")
+        print("Install with: pip install " + " ".join(missing))
+        return False
+    
+    return True
+
+def collect_chromadb_datas():
+    """List chromadb's config and text data files as PyInstaller datas"""
+    spec = importlib.util.find_spec('chromadb')
+    if spec is None or not spec.origin:
+        print("[WARNING] chromadb not found, no data files collected")
+        return []
+    
+    base = Path(spec.origin).parent
+    # PyInstaller expects the destination directory, not the file path
+    return [(str(path), (Path('chromadb') / path.parent.relative_to(base)).as_posix())
+            for path in base.rglob('*')
+            if path.suffix in CHROMADB_DATA_SUFFIXES and path.is_file()]
+
+def collect_hidden_imports():
+    """Submodules of COLLECTED_PACKAGES, cached per installed package version"""
+    try:
+        cache = json.loads(HIDDEN_IMPORTS_CACHE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cache = {}
+    
+    collected = []
+    updated = False
+    for package in COLLECTED_PACKAGES:
+        try:
+            version = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            print(f"[WARNING] {package} not installed, submodules not collected")
+            continue
+        
+        entry = cache.get(package)
+        if not entry or entry.get('version') != version:
+            # Imported here: it is only needed when the cache is stale
+            from PyInstaller.utils.hooks import collect_submodules
+            print(f"[SPEC] Collecting {package} {version} submodules...")
+            modules = collect_submodules(package, filter=lambda name: '.test' not in name)
+            cache[package] = entry = {'version': version, 'modules': modules}
+            updated = True
+        collected.extend(entry['modules'])
+    
+    if updated:
+        try:
+            BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            HIDDEN_IMPORTS_CACHE.write_text(json.dumps(cache), encoding='utf-8')
+        except OSError:
+            pass  # Caching is best effort
+    return collected
+
+def create_enhanced_spec(include_debug=True):
+    """Create an enhanced spec file with Windows-specific fixes"""
+    print("[SPEC] Creating enhanced Windows spec file...")
+    
+    datas = collect_chromadb_datas()
+    collected_imports = collect_hidden_imports()
+    spec_content = WINDOWS_SPEC_TEMPLATE.format(datas=repr(datas),
+                                                collected_imports=repr(collected_imports))
+    if include_debug:
+        spec_content += WINDOWS_DEBUG_SPEC_TEMPLATE
+    write_spec(WINDOWS_SPEC_FILE, spec_content)
     
-    print("[OK] Enhanced spec file created: relevantr_windows.spec")
+    print(f"[OK] Enhanced spec file ready: {WINDOWS_SPEC_FILE}")
 
 def test_imports():
     """Test critical imports before building"""
     print("[TEST] Testing critical imports...")
     
-    test_script = """
-import sys
-print("Testing imports...")
-
-try:
-    import tkinter as tk
-    print("✓ tkinter OK")
-except Exception as e:
-    print(f"✗ tkinter ERROR: {e}")
-
-try:
-    import google.generativeai as genai
-    print("✓ google.generativeai OK")
-except Exception as e:
-    print(f"✗ google.generativeai ERROR: {e}")
-
-try:
-    from langchain_community.document_loaders import PyMuPDFLoader
-    print("✓ langchain_community OK")
-except Exception as e:
-    print(f"✗ langchain_community ERROR: {e}")
-
-try:
-    import chromadb
-    print("✓ chromadb OK")
-except Exception as e:
-    print(f"✗ chromadb ERROR: {e}")
-
-try:
-    import fitz
-    print("✓ PyMuPDF OK")
-except Exception as e:
-    print(f"✗ PyMuPDF ERROR: {e}")
-
-print("Import test complete.")
-"""
-    
-    try:
-        result = subprocess.run([sys.executable, "-c", test_script], 
-                              capture_output=True, text=True, timeout=30)
-        print("[TEST RESULTS]")
-        print(result.stdout)
-        if result.stderr:
-            print("[TEST ERRORS]")
-            print(result.stderr)
-        return result.returncode == 0
-    except Exception as e:
-        print(f"[ERROR] Import test failed: {e}")
-        return False
+    # check_environment() only reads package metadata, so this is the one
+    # place the runtime imports actually execute
+    failed = False
+    
+    print("[TEST RESULTS]")
+    with ProcessPoolExecutor(max_workers=min(8, len(IMPORT_TESTS))) as executor:
+        futures = {executor.submit(_probe_module, module): label
+                   for module, label in IMPORT_TESTS.items()}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                future.result()
+                print(f"✓ {label} OK")
+            except Exception as e:
+                print(f"✗ {label} ERROR: {e}")
+                failed = True
+    
+    print("Import test complete.")
+    return not failed
 
 def clean_build():
     """Clean previous build artifacts"""
     print("[CLEAN] Removing old build files...")
-    dirs_to_clean = ['build', 'dist', '__pycache__']
+    dirs_to_clean = [d for d in ['build', 'dist', '__pycache__'] if os.path.exists(d)]
     for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            print(f"[CLEAN] Removing {dir_name}/")
-            shutil.rmtree(dir_name)
+        print(f"[CLEAN] Removing {dir_name}/")
+    
+    remove_trees(dirs_to_clean)
+
+def fast_workpath():
+    """PyInstaller work directory on the fastest local storage available"""
+    # /dev/shm is RAM-backed on Linux; elsewhere %TEMP% is usually a local SSD
+    # even when the project sits on a slow or network drive
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    # Keyed by project path, so other checkouts (or users) sharing the same
+    # base directory never reuse each other's Analysis cache
+    project_hash = hashlib.sha1(os.path.abspath(os.getcwd()).encode()).hexdigest()[:12]
+    return os.path.join(base, f'relevantr_pyi_work_{project_hash}')
 
-def build_with_spec():
+def build_with_spec(incremental=False):
     """Build using the comprehensive spec file"""
     print("[BUILD] Building with enhanced spec file...")
     
-    if not os.path.exists("relevantr_windows.spec"):
-        print("[ERROR] relevantr_windows.spec not found!")
+    if not os.path.exists(WINDOWS_SPEC_FILE):
+        print(f"[ERROR] {WINDOWS_SPEC_FILE} not found!")
         return False
     
     try:
         # Use more verbose output
-        cmd = ['pyinstaller', '--clean', '--noconfirm', 'relevantr_windows.spec']
+        # Without --clean PyInstaller reuses the cached analysis in the workpath
+        cmd = ['pyinstaller', '--noconfirm', *([] if incremental else ['--clean']),
+               f'--workpath={fast_workpath()}', '--distpath=dist', WINDOWS_SPEC_FILE]
         print(f"[CMD] Running: {' '.join(cmd)}")
         
-        # Run with real-time output
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                                 text=True, universal_newlines=True)
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 text=True, bufsize=1, creationflags=SUBPROCESS_FLAGS)
         
-        # Show output in real time
-        for line in iter(process.stdout.readline, ''):
-            print(f"[BUILD] {line.rstrip()}")
+        # Show progress lines only; the full tail is kept for failures
+        tail = deque(maxlen=BUILD_OUTPUT_TAIL)
+        for line in process.stdout:
+            tail.append(line)
+            if BUILD_PROGRESS_PATTERN.search(line):
+                print(f"[BUILD] {line.rstrip()}")
         
         process.wait()
         
@@ -325,6 +420,8 @@ def build_with_spec():
             return True
         else:
             print(f"[ERROR] Build failed with return code: {process.returncode}")
+            print(f"[ERROR] Last {len(tail)} lines of PyInstaller output:")
+            print("".join(tail).rstrip())
             return False
             
     except subprocess.TimeoutExpired:
@@ -350,41 +447,21 @@ def test_built_app():
         return False
 
 def create_debug_version():
-    """Create a console version for debugging with error logging"""
-    print("[DEBUG] Creating debug version with console and error logging...")
+    """Set up the console debug build for error logging"""
+    print("[DEBUG] Setting up debug version with console and error logging...")
     
-    # Read the spec file and modify for debugging
-    with open("relevantr_windows.spec", "r") as f:
-        spec_content = f.read()
-    
-    # Create debug version with console enabled
-    debug_spec = spec_content.replace("console=False", "console=True")
-    debug_spec = debug_spec.replace("debug=False", "debug=True")
-    debug_spec = debug_spec.replace("name='Relevantr'", "name='Relevantr_Debug'")
-    
-    with open("relevantr_debug.spec", "w") as f:
-        f.write(debug_spec)
-    
-    try:
-        cmd = ['pyinstaller', '--clean', '--noconfirm', 'relevantr_debug.spec']
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        
-        if result.returncode == 0:
-            create_debug_batch()
-            print("[OK] Debug version created: dist/Relevantr_Debug/Relevantr_Debug.exe")
-            print("[INFO] Use debug_run.bat to capture error messages to debug.log")
-            return True
-        else:
-            print(f"[ERROR] Debug build failed: {result.stderr}")
-            return False
-            
-    except Exception as e:
-        print(f"[ERROR] Debug build failed: {e}")
+    # Built alongside the release version by the same spec
+    debug_exe = Path("dist") / "Relevantr_Debug" / "Relevantr_Debug.exe"
+    if not debug_exe.exists():
+        print(f"[ERROR] Debug build not found: {debug_exe}")
         return False
+    
+    create_debug_batch()
+    print(f"[OK] Debug version created: {debug_exe.as_posix()}")
+    print("[INFO] Use debug_run.bat to capture error messages to debug.log")
+    return True
 
-def create_debug_batch():
-    """Create a comprehensive batch file for debugging"""
-    batch_content = """@echo off
+_DEBUG_BATCH_TEMPLATE = """@echo off
 echo ============================================
 echo Relevantr Debug Version
 echo ============================================
@@ -439,22 +516,37 @@ echo.
 echo Press any key to exit...
 pause > nul
 """
-    
+
+# Batch files need CRLF line endings
+_DEBUG_BATCH_BYTES = _DEBUG_BATCH_TEMPLATE.replace('\n', '\r\n').encode('ascii', 'replace')
+
+def create_debug_batch():
+    """Create a comprehensive batch file for debugging"""
     batch_path = Path("dist") / "Relevantr_Debug" / "debug_run.bat"
     batch_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(batch_path, "w", encoding='ascii', errors='replace') as f:
-        f.write(batch_content)
+    write_atomic(batch_path, _DEBUG_BATCH_BYTES)
     
     print(f"[OK] Created debug batch file: {batch_path}")
 
 def main():
     """Enhanced main build process"""
+    parser = argparse.ArgumentParser(description="Build Relevantr for Windows")
+    parser.add_argument('--force', action='store_true',
+                        help="Build even if some imports fail")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reuse the previous build's analysis instead of cleaning")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Check every dependency instead of stopping at the first missing one")
+    parser.add_argument('--debug', action=argparse.BooleanOptionalAction, default=True,
+                        help="Also build the console debug version (default: on)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Relevantr Enhanced Windows Build Script")
     print("=" * 60)
     
-    if not check_environment():
+    if not check_environment(full=args.verbose):
         print("\n[CRITICAL] Environment check failed!")
         print("Please install missing dependencies and try again.")
         sys.exit(1)
@@ -466,18 +558,19 @@ def main():
     # Test imports before building
     if not test_imports():
         print("[WARNING] Some imports failed. Build may not work correctly.")
-        proceed = input("Continue anyway? (y/n): ").lower().strip()
-        if not proceed.startswith('y'):
+        if not args.force:
+            print("[INFO] Re-run with --force to build anyway")
             sys.exit(1)
     
     # Create enhanced spec file
-    create_enhanced_spec()
+    create_enhanced_spec(include_debug=args.debug)
     
     # Clean and build
-    clean_build()
+    if not args.incremental:
+        clean_build()
     
     print("\n[BUILD] Starting build process...")
-    if build_with_spec():
+    if build_with_spec(incremental=args.incremental):
         if test_built_app():
             print("\n" + "="*60)
             print("🎉 BUILD SUCCESSFUL!")
@@ -485,9 +578,9 @@ def main():
             print("[SUCCESS] Relevantr built successfully!")
             print("[INFO] Application ready in dist/Relevantr/")
             
-            # Always create debug version for troubleshooting
-            print("\n[DEBUG] Creating debug version for troubleshooting...")
-            create_debug_version()
+            # The debug version is built alongside for troubleshooting
+            if args.debug:
+                create_debug_version()
             
         else:
             print("\n[WARNING] Build completed but executable not found")
@@ -496,13 +589,11 @@ def main():
         print("❌ BUILD FAILED!")
         print("="*60)
         print("[FAILED] Build process failed!")
-        print("\n[TROUBLESHOOTING] Creating debug version...")
-        create_debug_version()
+        # The debug version comes from the same spec, so it failed too
         print("\n[NEXT STEPS]")
-        print("1. Run dist/Relevantr_Debug/debug_run.bat")
-        print("2. Check debug.log for specific error messages")
-        print("3. Install any missing dependencies")
-        print("4. Try building again")
+        print("1. Check the PyInstaller output above for specific error messages")
+        print("2. Install any missing dependencies")
+        print("3. Try building again")
         sys.exit(1)
 
 if __name__ == "__main__":
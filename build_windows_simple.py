@@ -6,119 +6,77 @@ Avoids Unicode issues and focuses on getting a working build
 
 import os
 import sys
+import argparse
 import subprocess
 import shutil
+import hashlib
+import importlib.metadata
+import importlib.util
+import threading
+from collections import deque
 from pathlib import Path
 
-def check_basic_requirements():
-    """Basic requirement check without Unicode characters"""
-    print("[CHECK] Verifying basic requirements...")
-    
-    # Check Python version
-    if sys.version_info < (3, 8):
-        print("[ERROR] Python 3.8+ required")
-        return False
-    print(f"[OK] Python {sys.version_info.major}.{sys.version_info.minor}")
-    
-    # Check PyInstaller
-    try:
-        import PyInstaller
-        print(f"[OK] PyInstaller {PyInstaller.__version__}")
-    except ImportError:
-        print("[ERROR] PyInstaller not found. Install with: pip install pyinstaller")
-        return False
-    
-    # Check if main script exists
-    if not os.path.exists("relevantr.py"):
-        print("[ERROR] relevantr.py not found in current directory")
-        return False
-    print("[OK] relevantr.py found")
-    
-    return True
+from build_app import (
+    BUILD_CACHE_DIR,
+    discard_tree,
+    remove_discarded_trees,
+    remove_trees,
+    write_spec,
+)
 
-def clean_build():
-    """Clean previous build artifacts"""
-    print("[CLEAN] Removing old build files...")
-    dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            print(f"[CLEAN] Removing {dir_name}/")
-            shutil.rmtree(dir_name)
+# PyInstaller config and work-directory caches, one set per environment
+PYI_CACHE_ROOT = BUILD_CACHE_DIR / "pyi"
 
-def create_simple_spec():
-    """Create a minimal, working spec file"""
-    print("[SPEC] Creating simple spec file...")
-    
-    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
+# Written to build/<app>.build_fingerprint after a successful build (kept
+# out of dist/ so it does not ship in the release folder)
+FINGERPRINT_FILE = '.build_fingerprint'
 
-block_cipher = None
+# Seconds before a PyInstaller run is killed
+BUILD_TIMEOUT = 300
 
-# Core hidden imports - includes ChromaDB telemetry fix
-hidden_imports = [
+# Core hidden imports - only modules PyInstaller cannot find from the imports
+# in relevantr.py; includes ChromaDB telemetry fix
+HIDDEN_IMPORTS = [
     # Google AI
-    'google.generativeai',
     'google.ai.generativelanguage',
     'google.protobuf',
     'google.auth',
     'google.api_core',
     
-    # LangChain
-    'langchain',
-    'langchain_community',
-    'langchain_community.document_loaders',
-    'langchain_community.vectorstores', 
-    'langchain_google_genai',
+    # LangChain lazy exports (resolved through module __getattr__)
+    'langchain_community.document_loaders.pdf',
+    'langchain_community.vectorstores.chroma',
     'langchain_core',
-    'langchain.text_splitter',
     
-    # ChromaDB with telemetry modules (fixes the missing module error)
+    # ChromaDB with telemetry modules (fixes the missing module error); the
+    # rest of chromadb is pulled in through these
     'chromadb',
-    'chromadb.api',
-    'chromadb.config',
-    'chromadb.utils',
-    'chromadb.telemetry',
-    'chromadb.telemetry.product',
     'chromadb.telemetry.product.posthog',
-    'chromadb.telemetry.events',
-    'chromadb.db',
-    'chromadb.db.impl',
-    'chromadb.segment',
-    'chromadb.segment.impl',
-    'chromadb.segment.impl.vector',
     'chromadb.segment.impl.vector.local_hnsw',
     
     # PDF processing
     'fitz',
     'pymupdf',
     
-    # GUI
-    'tkinter',
-    'tkinter.ttk',
-    'tkinter.filedialog',
-    'tkinter.messagebox',
-    'tkinter.scrolledtext',
-    
-    # Utilities
-    'tqdm',
-    'dotenv',
-    'sqlite3',
-    'json',
-    'threading',
-    'logging',
-    'uuid',
-    'pathlib',
-    'dataclasses',
-    'datetime',
-    'traceback',
-    
     # Additional ChromaDB dependencies
     'hnswlib',
     'posthog',
-    'requests',
-    'urllib3',
-    'certifi',
 ]
 
+# Packages whose bytecode precompile_pyc refreshes: the bundled ones, not
+# all of site-packages
+PRECOMPILE_PACKAGES = sorted({name.split('.')[0] for name in HIDDEN_IMPORTS} | {
+    'langchain', 'langchain_google_genai', 'numpy',
+})
+
+SIMPLE_SPEC_TEMPLATE = '''# -*- mode: python ; coding: utf-8 -*-
+
+import sys
+
+block_cipher = None
+
+hidden_imports = {hidden_imports}
+
 a = Analysis(
     ['relevantr.py'],
     pathex=[],
@@ -126,15 +84,24 @@ a = Analysis(
     datas=[],
     hiddenimports=hidden_imports,
     hookspath=[],
-    hooksconfig={},
+    hooksconfig={{}},
     runtime_hooks=[],
-    excludes=['matplotlib', 'scipy', 'numpy', 'pandas'],
+    # numpy stays: chromadb and hnswlib import it at load time
+    excludes=['matplotlib', 'scipy', 'pandas', 'PIL', 'IPython', 'jupyter', 'notebook', 'pytest'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
 )
 
+# Runtime DLLs that UPX tends to corrupt or get flagged by antivirus
+upx_exclude = [
+    'vcruntime140.dll',
+    'vcruntime140_1.dll',
+    'python3.dll',
+    'python%d%d.dll' % sys.version_info[:2],
+]
+
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
 exe = EXE(
@@ -146,7 +113,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx={upx_release},
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -155,59 +122,271 @@ exe = EXE(
     entitlements_file=None,
 )
 
+# COLLECT copies instead of hard-linking on purpose: the sources are the live
+# site-packages files and PyInstaller's binary cache, and anything that edits
+# dist/ in place (signing, patching) would silently modify them too
 coll = COLLECT(
     exe,
     a.binaries,
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
-    upx_exclude=[],
+    upx={upx_release},
+    upx_exclude=upx_exclude,
     name='Relevantr',
 )
+
+# Debug version from the same Analysis, so dependencies are only scanned once
+debug_exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Relevantr_Debug',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+debug_coll = COLLECT(
+    debug_exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='Relevantr_Debug',
+)
 '''
+
+def check_basic_requirements():
+    """Basic requirement check without Unicode characters"""
+    print("[CHECK] Verifying basic requirements...")
+    
+    # Check Python version
+    if sys.version_info < (3, 8):
+        print("[ERROR] Python 3.8+ required")
+        return False
+    print(f"[OK] Python {sys.version_info.major}.{sys.version_info.minor}")
+    
+    # Check PyInstaller (from its package metadata, without importing it)
+    try:
+        print(f"[OK] PyInstaller {importlib.metadata.version('pyinstaller')}")
+    except importlib.metadata.PackageNotFoundError:
+        print("[ERROR] PyInstaller not found. Install with: pip install pyinstaller")
+        return False
     
-    with open("relevantr_simple.spec", "w", encoding='utf-8') as f:
-        f.write(spec_content)
+    # Check if main script exists
+    if not os.path.exists("relevantr.py"):
+        print("[ERROR] relevantr.py not found in current directory")
+        return False
+    print("[OK] relevantr.py found")
     
-    print("[OK] Simple spec file created")
     return True
 
-def create_debug_spec():
-    """Create debug version spec file"""
-    print("[DEBUG] Creating debug spec file...")
+def clean_build():
+    """Clean previous build artifacts"""
+    print("[CLEAN] Removing old build files...")
+    for dir_name in ['build', 'dist', '__pycache__']:
+        remove_discarded_trees(dir_name)
+        if os.path.exists(dir_name):
+            print(f"[CLEAN] Removing {dir_name}/")
+            discard_tree(dir_name)
+
+def remove_previous_outputs():
+    """Remove last run's executables but keep PyInstaller's cache in build/"""
+    dirs_to_clean = [d for d in ['dist/Relevantr', 'dist/Relevantr_Debug'] if os.path.exists(d)]
+    for dir_name in dirs_to_clean:
+        print(f"[CLEAN] Removing {dir_name}/")
     
-    # Read the simple spec and modify for debugging
-    with open("relevantr_simple.spec", "r", encoding='utf-8') as f:
-        spec_content = f.read()
+    # The release and debug trees are independent, so delete them side by side
+    remove_trees(dirs_to_clean)
+
+def create_simple_spec(release_compress=False):
+    """Create a minimal, working spec file"""
+    print("[SPEC] Creating simple spec file...")
     
-    debug_spec = spec_content.replace("console=False", "console=True")
-    debug_spec = debug_spec.replace("name='Relevantr'", "name='Relevantr_Debug'")
+    spec_content = SIMPLE_SPEC_TEMPLATE.format(hidden_imports=repr(HIDDEN_IMPORTS),
+                                               upx_release=release_compress)
     
-    with open("relevantr_debug.spec", "w", encoding='utf-8') as f:
-        f.write(debug_spec)
+    # Left untouched when unchanged, so its mtime doesn't invalidate PyInstaller's cache
+    write_spec("relevantr_simple.spec", spec_content)
     
-    print("[OK] Debug spec file created")
+    print("[OK] Simple spec file ready")
     return True
 
-def build_application(spec_file, app_name):
+def precompile_pyc():
+    """Byte-compile the bundled packages on all cores ahead of PyInstaller's analysis"""
+    # Analysis loads modules through the import system, which uses a fresh
+    # __pycache__ entry instead of compiling the source again
+    package_dirs = []
+    for package in PRECOMPILE_PACKAGES:
+        try:
+            spec = importlib.util.find_spec(package)
+        except (ImportError, ValueError):
+            spec = None
+        # Single-file and extension modules are not worth a compileall run
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        # Shared or read-only installs are left for PyInstaller to compile
+        package_dirs.extend(d for d in spec.submodule_search_locations if os.access(d, os.W_OK))
+    
+    if not package_dirs:
+        return
+    print(f"[PRECOMPILE] Compiling bytecode for {len(package_dirs)} bundled package directories...")
+    result = subprocess.run([sys.executable, '-m', 'compileall', '-j', '0', '-q', *package_dirs],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        # Not fatal: PyInstaller compiles whatever is missing itself
+        print("[WARNING] Some files failed to byte-compile:")
+        print("\n".join(result.stdout.splitlines()[-20:]))
+
+def pyinstaller_cache_dir():
+    """Per-environment cache, valid until requirements.txt or Python changes"""
+    requirements = Path('requirements.txt')
+    data = requirements.read_bytes() if requirements.exists() else b''
+    key = hashlib.sha256(data + sys.version.encode()).hexdigest()[:16]
+    return PYI_CACHE_ROOT / key
+
+def build_fingerprint(spec_file):
+    """Hash of everything a build depends on"""
+    digest = hashlib.sha256()
+    for path in [spec_file, 'relevantr.py', 'requirements.txt']:
+        if os.path.exists(path):
+            digest.update(Path(path).read_bytes())
+        digest.update(b'\0')
+    digest.update(importlib.metadata.version('pyinstaller').encode())
+    # requirements.txt only has >= ranges, so upgrading a bundled package
+    # (e.g. pip install -U chromadb) must change the fingerprint too
+    for version in bundled_versions():
+        digest.update(version.encode() + b'\0')
+    return digest.hexdigest()
+
+def bundled_versions():
+    """name==version of the installed distributions behind PRECOMPILE_PACKAGES"""
+    # Import names (fitz, google, ...) map to distributions (pymupdf,
+    # google-generativeai, ...)
+    distributions = importlib.metadata.packages_distributions()
+    names = sorted({name for package in PRECOMPILE_PACKAGES
+                    for name in distributions.get(package, [package])})
+    versions = []
+    for name in names:
+        try:
+            versions.append(f"{name}=={importlib.metadata.version(name)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{name} missing")
+    return versions
+
+def _fingerprint_stamp(fingerprint, outputs):
+    """Fingerprint plus the outputs' mtimes, tying it to the executables in dist/"""
+    return "\n".join([fingerprint, *(str(output.stat().st_mtime_ns) for output in outputs)])
+
+def _toc_stamp(work_dir):
+    """Newest mtime of PyInstaller's *.toc tables in a work directory, or None"""
+    return max((toc.stat().st_mtime_ns for toc in Path(work_dir).glob('*.toc')), default=None)
+
+def refresh_work_dir_cache(work_dir, cached_work_dir):
+    """Replace the cached work directory with work_dir if PyInstaller rewrote its tables"""
+    # copytree keeps mtimes, so an unchanged build leaves the stamps equal
+    # and the (hundreds of MB) copy is skipped
+    stamp = _toc_stamp(work_dir)
+    if stamp is None or (cached_work_dir.exists() and _toc_stamp(cached_work_dir) == stamp):
+        return
+    
+    print(f"[CACHE] Updating {cached_work_dir}")
+    remove_discarded_trees(cached_work_dir)
+    # Copy next to the cache and swap it in, so stale files are not kept
+    # and an interrupted copy never leaves a half-written cache
+    tmp_dir = cached_work_dir.with_name(f"{cached_work_dir.name}.tmp-{os.getpid()}")
+    try:
+        shutil.copytree(work_dir, tmp_dir)
+        if cached_work_dir.exists():
+            discard_tree(cached_work_dir)
+        os.replace(tmp_dir, cached_work_dir)
+    except OSError as e:
+        print(f"[WARNING] Could not update build cache: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def build_application(spec_file, app_name, restore_cache=True):
     """Build the application using PyInstaller"""
     print(f"[BUILD] Building {app_name}...")
     
+    cache_dir = pyinstaller_cache_dir()
+    # PyInstaller's work directory holds the Analysis/PYZ tables it reuses
+    work_dir = Path('build') / Path(spec_file).stem
+    cached_work_dir = cache_dir / 'build' / work_dir.name
+    
+    # Both executables come out of the same spec
+    outputs = [Path('dist') / name / f"{name}.exe" for name in (app_name, f"{app_name}_Debug")]
+    fingerprint = build_fingerprint(spec_file)
+    fingerprint_path = Path('build') / f"{app_name}{FINGERPRINT_FILE}"
     try:
-        cmd = ['pyinstaller', '--clean', '--noconfirm', spec_file]
+        if (all(output.exists() for output in outputs)
+                and fingerprint_path.read_text(encoding='utf-8') == _fingerprint_stamp(fingerprint, outputs)):
+            print(f"[SKIP] {app_name} up-to-date")
+            return True
+    except OSError:
+        pass
+    
+    remove_previous_outputs()
+    # Already up-to-date files are skipped, so this is quick after the first run
+    precompile_pyc()
+    
+    try:
+        if restore_cache and not work_dir.exists() and cached_work_dir.exists():
+            print(f"[CACHE] Restoring {work_dir} from {cached_work_dir}")
+            shutil.copytree(cached_work_dir, work_dir)
+        
+        # No --clean: PyInstaller reuses its analysis cache in build/.
+        # Run as a module of this interpreter: the pyinstaller.exe console
+        # script is only a launcher that would start yet another process
+        cmd = [sys.executable, '-m', 'PyInstaller', '--noconfirm', spec_file]
         print(f"[CMD] {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, 
-                              encoding='utf-8', errors='replace', timeout=300)
+        # Builds of different apps never share PyInstaller's binary cache;
+        # the directory is kept so repeated builds of one app still reuse it
+        config_dir = cache_dir / 'config' / app_name
+        config_dir.mkdir(parents=True, exist_ok=True)
+        env = {**os.environ, 'PYINSTALLER_CONFIG_DIR': str(config_dir)}
+        
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, env=env, encoding='utf-8', errors='replace',
+                                   bufsize=1)
+        timed_out = threading.Event()
+        timer = threading.Timer(BUILD_TIMEOUT, lambda: (timed_out.set(), process.kill()))
+        timer.start()
         
-        if result.returncode == 0:
+        # Stream the output live; only the tail is kept for the failure report
+        tail = deque(maxlen=100)
+        try:
+            for line in process.stdout:
+                sys.stdout.write(line)
+                tail.append(line)
+            process.wait()
+        finally:
+            timer.cancel()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, BUILD_TIMEOUT)
+        
+        if process.returncode == 0:
             print(f"[OK] {app_name} built successfully")
+            fingerprint_path.parent.mkdir(exist_ok=True)
+            fingerprint_path.write_text(_fingerprint_stamp(fingerprint, outputs), encoding='utf-8')
+            refresh_work_dir_cache(work_dir, cached_work_dir)
             return True
         else:
             print(f"[ERROR] {app_name} build failed")
-            print("STDOUT:", result.stdout[-500:])  # Last 500 chars
-            print("STDERR:", result.stderr[-500:])  # Last 500 chars
+            print("Last lines of output:")
+            print("".join(tail).rstrip())
             return False
             
     except subprocess.TimeoutExpired:
@@ -219,14 +398,15 @@ def build_application(spec_file, app_name):
 
 def test_executable(exe_path):
     """Test if executable exists and get info"""
-    if exe_path.exists():
+    try:
         size_mb = exe_path.stat().st_size / (1024 * 1024)
-        print(f"[OK] Executable found: {exe_path}")
-        print(f"[INFO] Size: {size_mb:.1f} MB")
-        return True
-    else:
+    except FileNotFoundError:
         print(f"[ERROR] Executable not found: {exe_path}")
         return False
+    
+    print(f"[OK] Executable found: {exe_path}")
+    print(f"[INFO] Size: {size_mb:.1f} MB")
+    return True
 
 def create_debug_batch():
     """Create simple debug batch file"""
@@ -271,6 +451,13 @@ pause > nul
 
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Simple Windows build for Relevantr")
+    parser.add_argument('--release-compress', action='store_true',
+                        help="UPX-compress the release build (slow; for shipping builds)")
+    parser.add_argument('--full-clean', action='store_true',
+                        help="Remove build/ as well, for a build from scratch")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("Relevantr Simple Windows Build")
     print("=" * 50)
@@ -281,29 +468,25 @@ def main():
         sys.exit(1)
     
     # Clean old builds
-    clean_build()
+    if args.full_clean:
+        clean_build()
     
-    # Create spec files
-    if not create_simple_spec():
+    # Create spec file
+    if not create_simple_spec(release_compress=args.release_compress):
         print("\n[FAILED] Could not create spec file")
         sys.exit(1)
     
-    # Build main application
-    print("\n[STEP 1] Building main application...")
-    if build_application("relevantr_simple.spec", "Relevantr"):
+    # One PyInstaller run builds both the main and the debug application
+    print("\n[STEP 1] Building main and debug applications...")
+    if build_application("relevantr_simple.spec", "Relevantr", restore_cache=not args.full_clean):
+        print("\n[STEP 2] Checking executables...")
         exe_path = Path("dist/Relevantr/Relevantr.exe")
         if test_executable(exe_path):
             print("\n[SUCCESS] Main application built successfully!")
             print(f"[INFO] Location: {exe_path.absolute()}")
         else:
             print("\n[WARNING] Build completed but executable not found")
-    else:
-        print("\n[FAILED] Main application build failed")
-    
-    # Build debug version
-    print("\n[STEP 2] Building debug version...")
-    create_debug_spec()
-    if build_application("relevantr_debug.spec", "Relevantr_Debug"):
+        
         debug_exe = Path("dist/Relevantr_Debug/Relevantr_Debug.exe")
         if test_executable(debug_exe):
             create_debug_batch()
@@ -313,7 +496,7 @@ def main():
         else:
             print("\n[WARNING] Debug build completed but executable not found")
     else:
-        print("\n[FAILED] Debug version build failed")
+        print("\n[FAILED] Build failed")
     
     print("\n" + "=" * 50)
     print("Build process complete!")
@@ -0,0 +1,62 @@
+"""
+Cached collect_all() for the Relevantr PyInstaller hooks
+========================================================
+collect_all() walks every submodule of a package, which is slow for large
+packages like chromadb or langchain. The result is pickled next to the hooks
+and reused until the package is reinstalled or upgraded.
+"""
+
+import os
+import pickle
+import tempfile
+import importlib.util
+
+from PyInstaller.utils.hooks import collect_all
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _package_stamp(package):
+    """Return (location, mtime) identifying the installed package"""
+    spec = importlib.util.find_spec(package)
+    if spec is None:
+        return None
+    
+    # Namespace packages (e.g. google) have no origin file
+    if spec.origin and spec.origin != 'namespace':
+        location = spec.origin
+    else:
+        location = list(spec.submodule_search_locations)[0]
+    return location, os.path.getmtime(location)
+
+def cached_collect_all(package):
+    """collect_all(package), reusing a pickled result when the package is unchanged"""
+    stamp = _package_stamp(package)
+    cache_file = os.path.join(HOOKS_DIR, f"{package}.pkl")
+    
+    if stamp is not None:
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+            if cached['stamp'] == stamp:
+                return cached['result']
+        except (OSError, pickle.PickleError, EOFError, KeyError):
+            pass
+    
+    datas, binaries, hiddenimports = collect_all(package)
+    result = (datas, binaries, hiddenimports)
+    
+    if stamp is not None:
+        # Concurrent builds run these hooks too; write to a per-process temp
+        # file and rename it into place so no reader sees a partial pickle
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{package}.", suffix=".tmp", dir=HOOKS_DIR)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({'stamp': stamp, 'result': result}, f)
+            os.replace(tmp_path, cache_file)
+        except OSError:
+            # Caching is best effort
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    return result
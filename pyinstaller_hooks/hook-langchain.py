@@ -0,0 +1,8 @@
+# PyInstaller hook for langchain - cached equivalent of --collect-all=langchain
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _collect_cache import cached_collect_all
+
+datas, binaries, hiddenimports = cached_collect_all('langchain')
@@ -9,15 +9,32 @@ Created by: Erik Bitzek
 Date: August 2025
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
+import asyncio
+import enum
+import pickle
+import queue
+import re
+import array
+import hashlib
+import io
+import importlib.util
+import sqlite3
+import functools
 import logging
 import threading
 import traceback
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
+from dataclasses import dataclass, field
 from datetime import datetime
 
 # PyInstaller compatibility
@@ -29,18 +46,108 @@ else:
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-import google.generativeai as genai
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_community.vectorstores import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from tqdm import tqdm
+from tkinter import ttk, filedialog, messagebox
 import warnings
-from dotenv import load_dotenv
+
+# Checked with install instructions by main(); guarded so a missing numpy
+# reaches that check instead of failing here
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# google.generativeai, langchain_google_genai, langchain_community (Chroma,
+# PyMuPDFLoader), langchain_core's Document, the text splitter, dotenv and
+# the optional faiss/sqlite-vec backends are imported where first used so
+# the window opens without waiting for them
+
+# Optional faster JSON for metadata stored in SQLite
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
+CONTEXT_ITEM_TEMPLATE = (
+    "--- START CONTEXT_ITEM_{index}: Source File: {source} ---\n"
+    "{content}\n"
+    "--- END CONTEXT_ITEM_{index} ---"
+)
+
+# "<file> (Page: <page>)" display sources, as built by QueryProcessor._build_context
+SOURCE_PAGE_RE = re.compile(r"^(.+) \(Page: ([^)]+)\)$")
+
+# Tcl lambda inserting a list of {text values tag} rows into a ttk.Treeview
+SOURCE_ROWS_TCL = (
+    "{tree rows} {foreach row $rows {"
+    "lassign $row text values tag; $tree insert {} end -text $text -values $values -tags $tag"
+    "}}"
+)
+
+# Static prompt text around the per-query parts; kept as fixed strings so
+# every request starts with byte-identical text (usable for context caching)
+PROMPT_PREFIX = """
+You are an AI assistant specialized in scientific document analysis. Your task is to answer the user's question STRICTLY by referencing the provided document excerpts.
+
+**CRITICAL INSTRUCTIONS:**
+1. For EVERY piece of information you provide, you MUST identify its source
+2. Format your answer with explicit source attribution
+3. Include direct quotes or very close paraphrases from the source material
+4. If information is not present in the provided context, clearly state that
+
+**Desired Format:**
+Start with a brief overview, then for each specific point:
+- State the source: "According to [filename] (Page: X)..."
+- Include the relevant information: "The document states: '[quote or paraphrase]'"
+- Continue with additional sources as needed
+
+**Context Information:**
+"""
+
+PROMPT_QUERY_HEADER = "\n\n---\n**User Question:** "
+
+PROMPT_SUFFIX = "\n\nPlease provide a comprehensive, well-attributed answer based ONLY on the provided context.\n\n"
+
+# Model listings are cached so startup does not need an API round-trip
+MODELS_CACHE_FILE = Path.home() / ".cache" / "relevantr" / "models.json"
+MODELS_CACHE_TTL = 24 * 3600  # Seconds
+
+# Generation models in order of preference (best to fallback)
+MODEL_PREFERENCE = [
+    ("gemini-1.5-pro", "Premium model (paid tier)"),
+    ("gemini-1.5-flash", "Fast model (free tier)"),
+    ("gemini-pro", "Legacy model (deprecated)")
+]
+
+ALTERNATIVE_EMBEDDING_MODELS = ["models/embedding-001", "models/text-embedding-004"]
+
+# Per-file record of ingested PDFs, kept in the persist directory
+MANIFEST_FILE = "ingest_manifest.json"
+
+# The Gemini embedding endpoint accepts up to 100 texts per request
+EMBED_BATCH_SIZE = 100
+# Concurrent embedding requests while PDFs are still being parsed
+EMBED_WORKERS = 4
+SOURCE_VIEW_CACHE_SIZE = 10  # Passage Text widgets kept per query result
+
+class ModelTier(enum.IntEnum):
+    """Pricing tier of a generation model"""
+    FREE = 0
+    PREMIUM = 1
+    
+    @classmethod
+    def for_model(cls, model_name: str) -> "ModelTier":
+        lowered = model_name.lower()
+        return cls.PREMIUM if "pro" in lowered and "flash" not in lowered else cls.FREE
+    
+    @property
+    def label(self) -> str:
+        return "Premium model" if self is ModelTier.PREMIUM else "Free tier model"
+
 @dataclass
 class Config:
     """Application configuration"""
@@ -51,8 +158,71 @@ class Config:
     chunk_size: int = 1000
     chunk_overlap: int = 200
     max_retrieved_docs: int = 7
+    vector_backend: str = "chroma"  # "chroma", "faiss" (needs faiss-cpu) or "sqlite-vec"
+    quantize_vectors: bool = False  # Store int8 vectors (faiss and sqlite-vec backends only)
+    matrix_search_max_chunks: int = 50000  # Chroma only: brute-force numpy search up to this size, 0 disables
+    mmr_fetch_factor: int = 4  # Candidates fetched per returned document
+    mmr_lambda: float = 0.5  # 1.0 = pure relevance, 0.0 = pure diversity
+    query_cache_size: int = 128
+    query_cache_ttl: float = 3600.0  # Seconds
+    answer_cache_ttl: float = 300.0  # Seconds, for answers kept on disk
+    similarity_threshold: float = 0.95  # Cosine similarity for reusing a paraphrased question's answer
     window_width: int = 1200
     window_height: int = 800
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name == "generation_model":
+            # self.tier: ModelTier, parsed once whenever the model is set
+            super().__setattr__("tier", ModelTier.for_model(value))
+
+@dataclass
+class Chunks:
+    """Chunk texts and metadata as parallel lists rather than Document objects"""
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def add_file(self, pdf_file: str, chunks: List[tuple]):
+        """Append _load_one_pdf output for one file"""
+        # Deterministic ids, so re-ingesting a file replaces its chunks
+        source_hash = hashlib.sha1(pdf_file.encode()).hexdigest()
+        for chunk_index, (page_content, metadata) in enumerate(chunks):
+            metadata["source"] = pdf_file
+            metadata['page_number'] = metadata.get('page', 'Unknown')
+            self.texts.append(page_content)
+            self.metadatas.append(metadata)
+            self.ids.append(f"{source_hash}:{metadata['page_number']}:{chunk_index}")
+
+def list_available_models(api_key: str) -> Dict[str, List[str]]:
+    """Map model name -> supported generation methods for this API key.
+    
+    Cached on disk per key (by hash) for MODELS_CACHE_TTL seconds.
+    """
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    try:
+        cache = json.loads(MODELS_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    
+    entry = cache.get(key_hash)
+    if entry and time.time() - entry["ts"] < MODELS_CACHE_TTL:
+        return entry["models"]
+    
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    models = {m.name: list(m.supported_generation_methods) for m in genai.list_models()}
+    
+    cache[key_hash] = {"ts": time.time(), "models": models}
+    try:
+        MODELS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        MODELS_CACHE_FILE.write_text(json.dumps(cache))
+    except OSError:
+        pass  # Caching is best effort
+    return models
 
 class Logger:
     """Enhanced logging system"""
@@ -83,27 +253,587 @@ class Logger:
     def warning(self, message: str):
         self.logger.warning(message)
 
+def _json_dumps(obj: Any) -> str:
+    if orjson:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass  # e.g. non-string keys; the stdlib encoder handles those
+    return json.dumps(obj)
+
+def _json_loads(data: str) -> Any:
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _as_float32(vectors: Any) -> np.ndarray:
+    """Pack embedding vectors into a contiguous float32 matrix"""
+    # The API returns lists of Python floats (~24 bytes each plus list
+    # overhead); packing each batch on arrival keeps a large ingest at
+    # 4 bytes per dimension until the vector store consumes it
+    if len(vectors) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.asarray(vectors, dtype=np.float32)
+
+@functools.lru_cache(maxsize=4)
+def _text_splitter(chunk_size: int, chunk_overlap: int) -> "RecursiveCharacterTextSplitter":
+    """Text splitter shared by every file a worker process handles"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        is_separator_regex=False,
+    )
+
+def _load_one_pdf(pdf_path: str, chunk_size: int, chunk_overlap: int):
+    """Parse and split one PDF in a worker process.
+    
+    Returns (chunks, problem): chunks is a list of picklable
+    (page_content, metadata) tuples, problem a short reason or None.
+    """
+    try:
+        # Check file accessibility
+        if not os.path.exists(pdf_path):
+            return [], "file not found"
+        if os.path.getsize(pdf_path) == 0:
+            return [], "empty file"
+        
+        # Test PyMuPDF directly first
+        try:
+            import fitz
+            test_doc = fitz.open(pdf_path)
+            page_count = len(test_doc)
+            test_doc.close()
+            if page_count == 0:
+                return [], "no pages"
+        except Exception as fitz_error:
+            return [], f"PyMuPDF error: {fitz_error}"
+        
+        # Process with LangChain
+        from langchain_community.document_loaders import PyMuPDFLoader
+        text_splitter = _text_splitter(chunk_size, chunk_overlap)
+        pages_from_pdf = PyMuPDFLoader(pdf_path).load_and_split(text_splitter=text_splitter)
+        if not pages_from_pdf:
+            return [], "no content extracted"
+        
+        return [(page.page_content, page.metadata) for page in pages_from_pdf], None
+        
+    except Exception as e:
+        return [], f"{type(e).__name__}: {str(e)[:50]}"
+
+class EmbeddingCache:
+    """Persistent cache of query embeddings, keyed by SHA-256 of model and text"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self._lock = threading.Lock()
+        # Embeddings objects (pydantic models, not hashable) by model name,
+        # so the in-process layer can be keyed on (model, text) alone
+        self._embeddings = {}
+        # In-process layer in front of the SQLite table for the hot path
+        self._cached_embed = functools.lru_cache(maxsize=512)(self._embed_query)
+    
+    @property
+    def path(self) -> str:
+        return os.path.join(self.config.persist_directory, "embed_cache.sqlite")
+    
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.config.persist_directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(sha256 TEXT PRIMARY KEY, dim INT, vec BLOB, ts REAL)"
+        )
+        return conn
+    
+    def embed_query(self, text: str, embeddings: Any) -> List[float]:
+        model = getattr(embeddings, 'model', '')
+        self._embeddings[model] = embeddings
+        return self._cached_embed(model, text)
+    
+    def _embed_query(self, model: str, text: str) -> List[float]:
+        key = hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+        
+        # The cache is best effort; any SQLite problem falls back to the API
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                row = conn.execute("SELECT vec FROM embeddings WHERE sha256 = ?", (key,)).fetchone()
+            if row:
+                return array.array('f', row[0]).tolist()
+        except sqlite3.Error:
+            pass
+        
+        vector = self._embeddings[model].embed_query(text)
+        
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                    (key, len(vector), array.array('f', vector).tobytes(), time.time())
+                )
+        except sqlite3.Error:
+            pass
+        return vector
+
+def _fast_rmtree(root: str, workers: int = 8):
+    """shutil.rmtree with files unlinked in parallel (persist directories hold many small segment files)"""
+    files, dirs = [], []
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+        for name in dirnames:
+            path = os.path.join(dirpath, name)
+            (files if os.path.islink(path) else dirs).append(path)
+    dirs.append(root)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(os.unlink, files))
+    for path in dirs:  # Bottom-up, so children go first
+        os.rmdir(path)
+
+def _query_hash(query: str) -> str:
+    """Cache key for a question, ignoring case and surrounding whitespace"""
+    return hashlib.sha256(query.strip().lower().encode()).hexdigest()
+
+def _mmr_select(query_vector: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """Indices of k candidates chosen by maximal marginal relevance"""
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+    
+    # All similarities are computed once; selection then only needs the
+    # running maximum similarity of each candidate to the chosen set
+    sim_to_query = candidates @ query_vector
+    sim_matrix = candidates @ candidates.T
+    
+    selected = [int(np.argmax(sim_to_query))]
+    max_sim_to_selected = sim_matrix[:, selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * sim_to_query - (1 - lambda_mult) * max_sim_to_selected
+        idx = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(idx)
+        available[idx] = False
+        max_sim_to_selected = np.maximum(max_sim_to_selected, sim_matrix[:, idx])
+    
+    return selected
+
+class AnswerCache:
+    """Answers and retrieved passages persisted across sessions in SQLite"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self._lock = threading.RLock()
+    
+    @property
+    def path(self) -> str:
+        return os.path.join(self.config.persist_directory, "query_cache.sqlite")
+    
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.config.persist_directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers "
+            "(sha256 TEXT, k INT, model TEXT, answer TEXT, docs_json TEXT, ts REAL, "
+            "PRIMARY KEY (sha256, k, model))"
+        )
+        return conn
+    
+    def get(self, query_hash: str, k: int, model: str) -> Optional[Dict[str, Any]]:
+        """Cached (answer, retrieved_docs) younger than the TTL, or None"""
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT answer, docs_json FROM answers WHERE sha256 = ? AND k = ? AND model = ? AND ts > ?",
+                    (query_hash, k, model, time.time() - self.config.answer_cache_ttl)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if not row:
+            return None
+        from langchain_core.documents import Document
+        docs = [Document(page_content=text, metadata=metadata) for text, metadata in _json_loads(row[1])]
+        return {"answer": row[0], "retrieved_docs": docs}
+    
+    def put(self, query_hash: str, k: int, model: str, answer: str, retrieved_docs: List[Any]):
+        docs_json = _json_dumps([(doc.page_content, doc.metadata) for doc in retrieved_docs])
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                    (query_hash, k, model, answer, docs_json, time.time())
+                )
+        except sqlite3.Error:
+            pass  # Caching is best effort
+    
+    def clear(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM answers")
+        except sqlite3.Error:
+            pass
+
+class QueryCache:
+    """Thread-safe LRU cache with expiry for retrieval results and answers"""
+    
+    def __init__(self, max_size: int = 128, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get((self.generation, key))
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[(self.generation, key)]
+                return None
+            self._entries.move_to_end((self.generation, key))
+            return value
+    
+    def put(self, key: tuple, value: Any):
+        with self._lock:
+            self._entries[(self.generation, key)] = (time.monotonic(), value)
+            self._entries.move_to_end((self.generation, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """Drop all entries, e.g. after the vector database changed"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+class SemanticCache:
+    """Answers of earlier questions, looked up by cosine similarity of the query embeddings"""
+    
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._vectors = np.empty((0, 0), dtype=np.float32)  # L2-normalized rows
+        self._keys = []
+        self._results = []
+        self._lock = threading.RLock()
+    
+    def get(self, vector: List[float], key: tuple, threshold: float) -> Any:
+        """Result of the most similar cached question with the same key if cosine >= threshold"""
+        query = _as_float32([vector])[0]
+        query /= np.linalg.norm(query) or 1.0
+        with self._lock:
+            if not self._results or self._vectors.shape[1] != query.shape[0]:
+                return None
+            similarities = self._vectors @ query
+            similarities[[k != key for k in self._keys]] = -1.0
+            best = int(np.argmax(similarities))
+            if similarities[best] < threshold:
+                return None
+            return self._results[best]
+    
+    def put(self, vector: List[float], key: tuple, value: Any):
+        row = _as_float32([vector])
+        row /= np.linalg.norm(row) or 1.0
+        with self._lock:
+            if self._results and self._vectors.shape[1] != row.shape[1]:
+                self.invalidate()  # Embedding model changed
+            self._vectors = np.vstack([self._vectors, row]) if self._results else row
+            self._keys.append(key)
+            self._results.append(value)
+            if len(self._results) > self.max_size:
+                self._vectors = self._vectors[1:]
+                del self._keys[0], self._results[0]
+    
+    def invalidate(self):
+        with self._lock:
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+            self._keys.clear()
+            self._results.clear()
+
+class FAISSVectorStore:
+    """Inner-product search over L2-normalized vectors with FAISS"""
+    
+    INDEX_FILE = "faiss.index"
+    DOCS_FILE = "faiss_docs.pkl"
+    
+    def __init__(self, persist_directory: str, embeddings: Any, index: Any, chunks: Chunks):
+        self.persist_directory = persist_directory
+        self.embeddings = embeddings
+        self.index = index
+        self.chunks = chunks
+    
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, chunks: Chunks, embeddings: Any,
+                     persist_directory: str, quantize: bool = False) -> "FAISSVectorStore":
+        import faiss
+        matrix = np.array(vectors, dtype=np.float32)
+        faiss.normalize_L2(matrix)
+        if quantize:
+            # int8 codes: a quarter of the memory, search stays near-exact
+            index = faiss.IndexScalarQuantizer(matrix.shape[1], faiss.ScalarQuantizer.QT_8bit,
+                                               faiss.METRIC_INNER_PRODUCT)
+            index.train(matrix)
+        else:
+            index = faiss.IndexFlatIP(matrix.shape[1])
+        index.add(matrix)
+        store = cls(persist_directory, embeddings, index, chunks)
+        store.save()
+        return store
+    
+    @classmethod
+    def load(cls, persist_directory: str, embeddings: Any) -> Optional["FAISSVectorStore"]:
+        index_path = os.path.join(persist_directory, cls.INDEX_FILE)
+        docs_path = os.path.join(persist_directory, cls.DOCS_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(docs_path)):
+            return None
+        with open(docs_path, "rb") as f:
+            pairs = pickle.load(f)
+        chunks = Chunks([text for text, _ in pairs], [metadata for _, metadata in pairs])
+        import faiss
+        return cls(persist_directory, embeddings, faiss.read_index(index_path), chunks)
+    
+    def save(self):
+        import faiss
+        os.makedirs(self.persist_directory, exist_ok=True)
+        faiss.write_index(self.index, os.path.join(self.persist_directory, self.INDEX_FILE))
+        with open(os.path.join(self.persist_directory, self.DOCS_FILE), "wb") as f:
+            pickle.dump(list(zip(self.chunks.texts, self.chunks.metadatas)), f)
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Any]:
+        return self.similarity_search_with_vectors(embedding, k)[0]
+    
+    def similarity_search_with_vectors(self, embedding: List[float], k: int = 4):
+        """Top-k documents plus their stored (normalized) vectors"""
+        import faiss
+        query = np.asarray([embedding], dtype=np.float32)
+        faiss.normalize_L2(query)
+        _, indices = self.index.search(query, min(k, self.index.ntotal))
+        hits = [int(i) for i in indices[0] if i >= 0]
+        vectors = np.vstack([self.index.reconstruct(i) for i in hits]) if hits else np.empty((0, self.index.d), dtype=np.float32)
+        from langchain_core.documents import Document
+        documents = [Document(page_content=self.chunks.texts[i], metadata=self.chunks.metadatas[i]) for i in hits]
+        return documents, vectors
+    
+    def count(self) -> int:
+        return self.index.ntotal
+
+@functools.lru_cache(maxsize=None)
+def _sqlite_vec_available() -> bool:
+    """Whether the sqlite-vec extension can be loaded into this Python's SQLite"""
+    try:
+        import sqlite_vec
+    except ImportError:
+        return False
+    try:
+        with closing(sqlite3.connect(":memory:")) as conn:
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+        return True
+    except (AttributeError, sqlite3.Error):
+        # AttributeError: Python built without extension loading support
+        return False
+
+class SqliteVecStore:
+    """KNN search with a sqlite-vec virtual table in a single database file"""
+    
+    DB_FILE = "chunks.sqlite"
+    
+    def __init__(self, persist_directory: str, embeddings: Any):
+        self.persist_directory = persist_directory
+        self.embeddings = embeddings
+        self.quantized = False
+        self._lock = threading.Lock()
+        os.makedirs(persist_directory, exist_ok=True)
+        # Queries run on worker threads; the lock serializes connection use
+        self.conn = sqlite3.connect(os.path.join(persist_directory, self.DB_FILE), check_same_thread=False)
+        import sqlite_vec
+        self.conn.enable_load_extension(True)
+        sqlite_vec.load(self.conn)
+        self.conn.enable_load_extension(False)
+    
+    @staticmethod
+    def _normalized(vectors: Any) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, chunks: Chunks, embeddings: Any,
+                     persist_directory: str, quantize: bool = False) -> "SqliteVecStore":
+        store = cls(persist_directory, embeddings)
+        store.quantized = quantize
+        matrix = cls._normalized(vectors)
+        column_type = "INT8" if quantize else "FLOAT"
+        with store._lock, store.conn:
+            store.conn.execute("DROP TABLE IF EXISTS vec_chunks")
+            store.conn.execute("DROP TABLE IF EXISTS chunks")
+            store.conn.execute(f"CREATE VIRTUAL TABLE vec_chunks USING vec0(embedding {column_type}[{matrix.shape[1]}])")
+            store.conn.execute("CREATE TABLE chunks (id INTEGER PRIMARY KEY, content TEXT, metadata TEXT)")
+            store.conn.executemany(
+                f"INSERT INTO vec_chunks (rowid, embedding) VALUES (?, {store._vector_param})",
+                ((i, row.tobytes()) for i, row in enumerate(matrix))
+            )
+            store.conn.executemany(
+                "INSERT INTO chunks (id, content, metadata) VALUES (?, ?, ?)",
+                ((i, text, _json_dumps(metadata)) for i, (text, metadata) in enumerate(zip(chunks.texts, chunks.metadatas)))
+            )
+        return store
+    
+    @classmethod
+    def load(cls, persist_directory: str, embeddings: Any) -> Optional["SqliteVecStore"]:
+        if not os.path.exists(os.path.join(persist_directory, cls.DB_FILE)):
+            return None
+        store = cls(persist_directory, embeddings)
+        with store._lock:
+            found = store.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'vec_chunks'"
+            ).fetchone()
+        if not found:
+            return None
+        store.quantized = "INT8[" in found[0].upper()
+        return store
+    
+    @property
+    def _vector_param(self) -> str:
+        # Normalized components lie in [-1, 1], which 'unit' maps onto int8
+        return "vec_quantize_int8(?, 'unit')" if self.quantized else "?"
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Any]:
+        return self.similarity_search_with_vectors(embedding, k)[0]
+    
+    def similarity_search_with_vectors(self, embedding: List[float], k: int = 4):
+        """Top-k documents plus their stored (normalized) vectors"""
+        query = self._normalized(embedding)[0]
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT v.embedding, c.content, c.metadata FROM "
+                f"(SELECT rowid, embedding, distance FROM vec_chunks WHERE embedding MATCH {self._vector_param} AND k = ?) v "
+                "JOIN chunks c ON c.id = v.rowid ORDER BY v.distance",
+                (query.tobytes(), k)
+            ).fetchall()
+        from langchain_core.documents import Document
+        documents = [Document(page_content=content, metadata=_json_loads(metadata)) for _, content, metadata in rows]
+        if not rows:
+            return documents, np.empty((0, len(query)), dtype=np.float32)
+        if self.quantized:
+            vectors = np.vstack([np.frombuffer(blob, dtype=np.int8) for blob, _, _ in rows]).astype(np.float32) / 127
+        else:
+            vectors = np.vstack([np.frombuffer(blob, dtype=np.float32) for blob, _, _ in rows])
+        return documents, vectors
+    
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+# Stores that take precomputed vectors; anything else uses Chroma
+VECTOR_STORES = {
+    "faiss": FAISSVectorStore,
+    "sqlite-vec": SqliteVecStore,
+}
+
+class VectorMatrix:
+    """L2-normalized float32 copy of a small Chroma collection for brute-force search"""
+    
+    MATRIX_FILE = "embeddings.f32.npy"
+    IDS_FILE = "embeddings_ids.json"
+    PAGE_SIZE = 5000  # Vectors fetched from the collection per request
+    
+    def __init__(self, matrix: np.ndarray, ids: List[str]):
+        self.matrix = matrix
+        self.ids = ids
+    
+    @classmethod
+    def remove(cls, persist_directory: str):
+        for name in (cls.MATRIX_FILE, cls.IDS_FILE):
+            try:
+                os.remove(os.path.join(persist_directory, name))
+            except FileNotFoundError:
+                pass
+    
+    @classmethod
+    def from_collection(cls, collection: Any, persist_directory: str) -> "VectorMatrix":
+        count = collection.count()
+        matrix = np.empty((0, 0), dtype=np.float32)
+        ids = []
+        # Paged into a preallocated matrix, so only one page of vectors is
+        # ever held as Python lists
+        for offset in range(0, count, cls.PAGE_SIZE):
+            page = collection.get(include=["embeddings"], limit=cls.PAGE_SIZE, offset=offset)
+            vectors = _as_float32(page["embeddings"])
+            if not len(vectors):
+                break
+            if not matrix.size:
+                matrix = np.empty((count, vectors.shape[1]), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            matrix[len(ids):len(ids) + len(vectors)] = vectors
+            ids.extend(page["ids"])
+        matrix = matrix[:len(ids)]
+        
+        np.save(os.path.join(persist_directory, cls.MATRIX_FILE), matrix)
+        with open(os.path.join(persist_directory, cls.IDS_FILE), "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+        return cls(matrix, ids)
+    
+    @classmethod
+    def load(cls, persist_directory: str) -> Optional["VectorMatrix"]:
+        matrix_path = os.path.join(persist_directory, cls.MATRIX_FILE)
+        ids_path = os.path.join(persist_directory, cls.IDS_FILE)
+        if not (os.path.exists(matrix_path) and os.path.exists(ids_path)):
+            return None
+        # Memory-mapped, so the pages are shared and only read when searched
+        matrix = np.load(matrix_path, mmap_mode="r")
+        with open(ids_path, "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        return cls(matrix, ids) if len(ids) == matrix.shape[0] else None
+    
+    def search(self, embedding: List[float], k: int):
+        """Ids of the top-k rows by cosine similarity, plus those rows"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= max(np.linalg.norm(query), 1e-12)
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.ids[i] for i in top], np.asarray(self.matrix[top])
+
 class DocumentProcessor:
     """Handles PDF processing and vector database operations"""
     
     def __init__(self, config: Config, logger: Logger):
         self.config = config
         self.logger = logger
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.chunk_size,
-            chunk_overlap=config.chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
         self.embeddings = None
         self.vector_db = None
+        # Chunk count, refreshed only when the database is loaded or written
+        self._doc_count = None
     
     def initialize_embeddings(self, api_key: str):
         """Initialize Google embeddings"""
+        import google.generativeai as genai
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        
         try:
             # Configure genai with API key first
             genai.configure(api_key=api_key)
             
+            # Validate the key and model with a (cached) model listing instead
+            # of a test embedding; fall back to probing if listing fails
+            try:
+                available = list_available_models(api_key)
+            except Exception as list_error:
+                self.logger.warning(f"Could not list models, probing instead: {list_error}")
+                available = {}
+            
+            candidates = [self.config.embedding_model] + [
+                m for m in ALTERNATIVE_EMBEDDING_MODELS if m != self.config.embedding_model
+            ]
+            for model in candidates:
+                if "embedContent" in available.get(model, ()):
+                    self.embeddings = GoogleGenerativeAIEmbeddings(model=model, google_api_key=api_key)
+                    self.config.embedding_model = model
+                    self.logger.info(f"Embeddings initialized with {model}")
+                    return True
+            
             # Initialize embeddings with explicit API key
             self.embeddings = GoogleGenerativeAIEmbeddings(
                 model=self.config.embedding_model,
@@ -119,9 +849,7 @@ class DocumentProcessor:
             self.logger.error(f"Failed to initialize embeddings: {e}")
             
             # Try alternative embedding models for compatibility
-            alternative_models = ["models/embedding-001", "models/text-embedding-004"]
-            
-            for alt_model in alternative_models:
+            for alt_model in ALTERNATIVE_EMBEDDING_MODELS:
                 if alt_model == self.config.embedding_model:
                     continue
                     
@@ -145,10 +873,8 @@ class DocumentProcessor:
             
             return False
     
-    def load_and_process_pdfs(self, pdf_directory: str, progress_callback=None) -> List[Any]:
-        """Load and process PDF files with progress tracking"""
-        documents = []
-        
+    def _list_pdf_files(self, pdf_directory: str) -> Dict[str, os.DirEntry]:
+        """Map file name -> directory entry for the PDFs in a directory, raising if there are none"""
         if not os.path.exists(pdf_directory):
             error_msg = f"PDF directory '{pdf_directory}' not found"
             self.logger.error(error_msg)
@@ -156,7 +882,11 @@ class DocumentProcessor:
         
         # Check if directory is readable
         try:
-            pdf_files = [f for f in os.listdir(pdf_directory) if f.endswith(".pdf")]
+            with os.scandir(pdf_directory) as entries:
+                pdf_files = {
+                    entry.name: entry for entry in entries
+                    if entry.name.lower().endswith(".pdf") and entry.is_file()
+                }
         except PermissionError as e:
             error_msg = f"Permission denied accessing directory '{pdf_directory}': {e}"
             self.logger.error(error_msg)
@@ -168,82 +898,25 @@ class DocumentProcessor:
             raise ValueError(error_msg)
         
         self.logger.info(f"Found {len(pdf_files)} PDF files to process")
-        problematic_files = []
-        successful_files = []
-        
-        for i, pdf_file in enumerate(pdf_files):
-            if progress_callback:
-                progress_callback(i, len(pdf_files), f"Processing {pdf_file}")
-            
-            pdf_path = os.path.join(pdf_directory, pdf_file)
-            
-            try:
-                # Check file accessibility
-                if not os.path.exists(pdf_path):
-                    self.logger.error(f"PDF file not found: {pdf_path}")
-                    problematic_files.append(f"{pdf_file} (file not found)")
-                    continue
-                
-                file_size = os.path.getsize(pdf_path)
-                if file_size == 0:
-                    self.logger.error(f"PDF file is empty: {pdf_path}")
-                    problematic_files.append(f"{pdf_file} (empty file)")
-                    continue
-                
-                self.logger.info(f"Processing {pdf_file} ({file_size:,} bytes)")
-                
-                # Test PyMuPDF directly first
-                try:
-                    import fitz
-                    test_doc = fitz.open(pdf_path)
-                    page_count = len(test_doc)
-                    test_doc.close()
-                    
-                    if page_count == 0:
-                        self.logger.error(f"PDF has no pages: {pdf_path}")
-                        problematic_files.append(f"{pdf_file} (no pages)")
-                        continue
-                    
-                    self.logger.info(f"PDF validation passed: {pdf_file} ({page_count} pages)")
-                    
-                except Exception as fitz_error:
-                    self.logger.error(f"PyMuPDF validation failed for {pdf_file}: {fitz_error}")
-                    problematic_files.append(f"{pdf_file} (PyMuPDF error: {fitz_error})")
-                    continue
-                
-                # Process with LangChain
-                loader = PyMuPDFLoader(pdf_path)
-                pages_from_pdf = loader.load_and_split(text_splitter=self.text_splitter)
-                
-                if not pages_from_pdf:
-                    self.logger.error(f"No content extracted from {pdf_file}")
-                    problematic_files.append(f"{pdf_file} (no content extracted)")
-                    continue
-                
-                # Add metadata
-                for page in pages_from_pdf:
-                    page.metadata["source"] = pdf_file
-                    page.metadata['page_number'] = page.metadata.get('page', 'Unknown')
-                
-                documents.extend(pages_from_pdf)
-                successful_files.append(pdf_file)
-                self.logger.info(f"Successfully processed {pdf_file} - {len(pages_from_pdf)} chunks")
-                
-            except Exception as e:
-                error_details = f"Error processing {pdf_file}: {type(e).__name__}: {e}"
-                self.logger.error(error_details)
-                problematic_files.append(f"{pdf_file} ({type(e).__name__}: {str(e)[:50]})")
-                continue
-        
-        if progress_callback:
-            progress_callback(len(pdf_files), len(pdf_files), "Processing complete")
-        
-        # Final summary
+        return pdf_files
+    
+    def _pdf_executor(self, file_count: int):
+        """Executor for _load_one_pdf calls"""
+        # Parsing and splitting is CPU-bound and independent per file, so
+        # spread it over a process pool; frozen builds use a single worker
+        # thread because multiprocessing there needs extra bootstrapping
+        if hasattr(sys, '_MEIPASS') or file_count == 1:
+            return ThreadPoolExecutor(max_workers=1)
+        return ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, file_count))
+    
+    def _log_processing_summary(self, pdf_files: List[str], successful_files: List[str],
+                                problematic_files: List[str], chunks: Chunks, allow_empty: bool = False):
+        """Log the per-file outcome and raise if nothing was processed"""
         self.logger.info(f"Processing summary:")
         self.logger.info(f"  - Total PDF files found: {len(pdf_files)}")
         self.logger.info(f"  - Successfully processed: {len(successful_files)}")
         self.logger.info(f"  - Failed to process: {len(problematic_files)}")
-        self.logger.info(f"  - Total chunks created: {len(documents)}")
+        self.logger.info(f"  - Total chunks created: {len(chunks)}")
         
         if successful_files:
             self.logger.info("Successfully processed files:")
@@ -255,48 +928,237 @@ class DocumentProcessor:
             for file in problematic_files:
                 self.logger.warning(f"  ❌ {file}")
         
-        if not documents:
+        if not chunks and not allow_empty:
             error_msg = "No documents were successfully processed. Check the logs for detailed error information."
             self.logger.error(error_msg)
             raise ValueError(error_msg)
+    
+    def ingest_pdfs(self, pdf_directory: str, progress_callback=None) -> int:
+        """Parse, embed and store PDFs, overlapping parsing with embedding.
+        
+        With the Chroma backend only new, changed and deleted files are
+        touched; the manifest in the persist directory tracks the rest.
+        Returns the number of chunks in the database.
+        """
+        pdf_files = self._list_pdf_files(pdf_directory)
+        incremental = self._vector_backend() == "chroma"
+        manifest = self._load_manifest() if incremental else {}
+        
+        signatures = {}
+        for pdf_file, entry in pdf_files.items():
+            # DirEntry.stat() is cached, and free on Windows (from the listing)
+            st = entry.stat()
+            signatures[pdf_file] = {"mtime": st.st_mtime_ns, "size": st.st_size}
+        
+        # Entries whose file was changed or deleted; their chunks are replaced
+        stale = {
+            pdf_file: entry for pdf_file, entry in manifest.items()
+            if signatures.get(pdf_file) != {"mtime": entry["mtime"], "size": entry["size"]}
+        }
+        changed_files = [f for f in pdf_files if f not in manifest or f in stale]
+        unchanged_count = len(pdf_files) - len(changed_files)
+        if unchanged_count:
+            self.logger.info(f"Skipping {unchanged_count} unchanged PDF files")
+        
+        if changed_files:
+            chunks, vectors, successful_files, problematic_files = asyncio.run(
+                self._ingest_pipeline({f: pdf_files[f].path for f in changed_files}, progress_callback)
+            )
+            self._log_processing_summary(changed_files, successful_files, problematic_files, chunks,
+                                         allow_empty=unchanged_count > 0)
+        else:
+            chunks, vectors, successful_files = Chunks(), _as_float32([]), []
         
-        return documents
+        if changed_files or stale:
+            if progress_callback:
+                progress_callback(len(pdf_files), len(pdf_files), "Saving vector database...")
+            stale_ids = [chunk_id for entry in stale.values() for chunk_id in entry["chunk_ids"]]
+            self._store_vectors(chunks, vectors, stale_ids=stale_ids)
+        elif not self.vector_db:
+            self.load_existing_database()
+        
+        if incremental:
+            for pdf_file in stale:
+                del manifest[pdf_file]
+            ids_by_file = {pdf_file: [] for pdf_file in successful_files}
+            for chunk_id, metadata in zip(chunks.ids, chunks.metadatas):
+                ids_by_file[metadata["source"]].append(chunk_id)
+            for pdf_file, chunk_ids in ids_by_file.items():
+                manifest[pdf_file] = dict(signatures[pdf_file], chunk_ids=chunk_ids)
+            self._save_manifest(manifest)
+        
+        if progress_callback:
+            progress_callback(len(pdf_files), len(pdf_files), "Vector database created successfully")
+        
+        count = self.get_database_stats()["count"]
+        self.logger.info(f"Vector database updated with {len(chunks)} new chunks ({count} total)")
+        return count
     
-    def create_vector_database(self, documents: List[Any], progress_callback=None) -> bool:
-        """Create or update vector database"""
+    def _manifest_path(self) -> str:
+        return os.path.join(self.config.persist_directory, MANIFEST_FILE)
+    
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Per-file (mtime, size, chunk ids) of what is already in the database"""
         try:
-            if progress_callback:
-                progress_callback(0, 1, "Creating vector database...")
-            
-            # Create directory if it doesn't exist
-            os.makedirs(self.config.persist_directory, exist_ok=True)
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        os.makedirs(self.config.persist_directory, exist_ok=True)
+        with open(self._manifest_path(), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+    
+    async def _ingest_pipeline(self, pdf_files: Dict[str, str], progress_callback=None):
+        """Feed parsed chunks to concurrent embed workers as files finish"""
+        loop = asyncio.get_running_loop()
+        batch_queue = asyncio.Queue()
+        chunks = Chunks()
+        vectors_by_batch = {}
+        successful_files = []
+        problematic_files = []
+        parsed_files = 0
+        
+        queued = 0
+        embedded = 0
+        
+        async def embed_worker():
+            nonlocal embedded
+            while True:
+                batch = await batch_queue.get()
+                if batch is None:
+                    return
+                start, texts = batch
+                vectors_by_batch[start] = _as_float32(await self.embeddings.aembed_documents(texts))
+                embedded += len(texts)
+                if progress_callback:
+                    progress_callback(parsed_files, len(pdf_files), f"Embedded {embedded} chunks...")
+        
+        def queue_batches(final=False):
+            # Hand full batches (and the remainder at the end) to the workers
+            nonlocal queued
+            while len(chunks) - queued >= EMBED_BATCH_SIZE or (final and len(chunks) > queued):
+                texts = chunks.texts[queued:queued + EMBED_BATCH_SIZE]
+                batch_queue.put_nowait((queued, texts))
+                queued += len(texts)
+        
+        workers = [asyncio.create_task(embed_worker()) for _ in range(EMBED_WORKERS)]
+        
+        with self._pdf_executor(len(pdf_files)) as executor:
+            async def load(pdf_file):
+                return pdf_file, await loop.run_in_executor(
+                    executor, _load_one_pdf, pdf_files[pdf_file],
+                    self.config.chunk_size, self.config.chunk_overlap
+                )
             
-            self.vector_db = Chroma.from_documents(
-                documents=documents,
-                embedding=self.embeddings,
-                persist_directory=self.config.persist_directory
+            for task in asyncio.as_completed([load(pdf_file) for pdf_file in pdf_files]):
+                pdf_file, (file_chunks, problem) = await task
+                parsed_files += 1
+                if progress_callback:
+                    progress_callback(parsed_files, len(pdf_files), f"Processed {pdf_file}")
+                
+                if problem:
+                    self.logger.error(f"Error processing {pdf_file}: {problem}")
+                    problematic_files.append(f"{pdf_file} ({problem})")
+                    continue
+                
+                chunks.add_file(pdf_file, file_chunks)
+                successful_files.append(pdf_file)
+                self.logger.info(f"Successfully processed {pdf_file} - {len(file_chunks)} chunks")
+                queue_batches()
+        
+        queue_batches(final=True)
+        for _ in workers:
+            batch_queue.put_nowait(None)
+        await asyncio.gather(*workers)
+        
+        vectors = np.vstack([vectors_by_batch[start] for start in sorted(vectors_by_batch)]) if vectors_by_batch else _as_float32([])
+        return chunks, vectors, successful_files, problematic_files
+    
+    def _store_vectors(self, chunks: Chunks, vectors: np.ndarray, stale_ids: Optional[List[str]] = None):
+        """Write chunks and their precomputed vectors to the vector store.
+        
+        stale_ids are deleted first (Chroma only; other stores are rebuilt).
+        """
+        # Create directory if it doesn't exist
+        os.makedirs(self.config.persist_directory, exist_ok=True)
+        
+        store_class = VECTOR_STORES.get(self._vector_backend())
+        if store_class:
+            self.vector_db = store_class.from_vectors(
+                vectors, chunks, self.embeddings, self.config.persist_directory,
+                quantize=self.config.quantize_vectors
             )
-            
-            # Note: ChromaDB 0.4.x auto-persists, no need to call persist()
-            
-            if progress_callback:
-                progress_callback(1, 1, "Vector database created successfully")
-            
-            self.logger.info(f"Vector database created with {len(documents)} documents")
-            return True
-            
+            self._refresh_doc_count()
+            return
+        
+        from langchain_community.vectorstores import Chroma
+        self.vector_db = Chroma(
+            persist_directory=self.config.persist_directory,
+            embedding_function=self.embeddings
+        )
+        
+        for start in range(0, len(stale_ids or []), EMBED_BATCH_SIZE):
+            self.vector_db._collection.delete(ids=stale_ids[start:start + EMBED_BATCH_SIZE])
+        
+        # Add the precomputed vectors straight to the collection so
+        # LangChain does not embed the chunks a second time
+        for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+            end = start + EMBED_BATCH_SIZE
+            self.vector_db._collection.upsert(
+                ids=chunks.ids[start:end],
+                embeddings=vectors[start:end].tolist(),
+                documents=chunks.texts[start:end],
+                metadatas=chunks.metadatas[start:end]
+            )
+        
+        # Note: ChromaDB 0.4.x auto-persists, no need to call persist()
+        self._refresh_doc_count()
+        self._write_vector_matrix()
+    
+    def _write_vector_matrix(self):
+        """Rewrite the brute-force search matrix, kept only for small collections"""
+        VectorMatrix.remove(self.config.persist_directory)
+        if not 0 < (self._doc_count or 0) <= self.config.matrix_search_max_chunks:
+            return
+        try:
+            VectorMatrix.from_collection(self.vector_db._collection, self.config.persist_directory)
         except Exception as e:
-            self.logger.error(f"Failed to create vector database: {e}")
-            return False
+            # Queries fall back to Chroma's index without it
+            VectorMatrix.remove(self.config.persist_directory)
+            self.logger.warning(f"Could not write search matrix: {e}")
+    
+    def _vector_backend(self) -> str:
+        """The configured vector backend, or "chroma" if it is unavailable"""
+        backend = self.config.vector_backend
+        if backend == "faiss" and importlib.util.find_spec("faiss") is None:
+            self.logger.warning("FAISS backend requested but faiss is not installed - using Chroma")
+            return "chroma"
+        if backend == "sqlite-vec" and not _sqlite_vec_available():
+            self.logger.warning("sqlite-vec backend requested but the extension cannot be loaded - using Chroma")
+            return "chroma"
+        return backend
     
     def load_existing_database(self) -> bool:
         """Load existing vector database"""
         try:
+            store_class = VECTOR_STORES.get(self._vector_backend())
+            if store_class:
+                self.vector_db = store_class.load(self.config.persist_directory, self.embeddings)
+                if self.vector_db:
+                    self._refresh_doc_count()
+                    self.logger.info(f"Existing {self.config.vector_backend} index loaded successfully")
+                    return True
+                return False
+            
             if os.path.exists(self.config.persist_directory) and os.listdir(self.config.persist_directory):
+                from langchain_community.vectorstores import Chroma
                 self.vector_db = Chroma(
                     persist_directory=self.config.persist_directory,
                     embedding_function=self.embeddings
                 )
+                self._refresh_doc_count()
                 self.logger.info("Existing vector database loaded successfully")
                 return True
             return False
@@ -309,11 +1171,21 @@ class DocumentProcessor:
         if not self.vector_db:
             return {"status": "not_initialized", "count": 0}
         
-        try:
-            count = self.vector_db._collection.count()
-            return {"status": "ready", "count": count}
-        except:
+        if self._doc_count is None:
+            self._refresh_doc_count()
+        if self._doc_count is None:
             return {"status": "error", "count": 0}
+        return {"status": "ready", "count": self._doc_count}
+    
+    def _refresh_doc_count(self):
+        """Re-read the chunk count from the vector store"""
+        try:
+            if isinstance(self.vector_db, tuple(VECTOR_STORES.values())):
+                self._doc_count = self.vector_db.count()
+            else:
+                self._doc_count = self.vector_db._collection.count()
+        except Exception:
+            self._doc_count = None
 
 class QueryProcessor:
     """Handles query processing and response generation"""
@@ -322,23 +1194,45 @@ class QueryProcessor:
         self.config = config
         self.logger = logger
         self.llm = None
+        self._api_key = None
+        self._llm_candidates = []
+        self._llm_index = -1
+        self.embedding_cache = EmbeddingCache(config)
+        self.query_cache = QueryCache(config.query_cache_size, config.query_cache_ttl)
+        self.answer_cache = AnswerCache(config)
+        self.semantic_cache = SemanticCache(config.query_cache_size)
+        # Loaded on first query; False when there is no usable matrix
+        self._vector_matrix = None
     
     def initialize_llm(self, api_key: str):
         """Initialize Gemini LLM with automatic model detection"""
+        import google.generativeai as genai
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
         try:
             # Configure the API first
             genai.configure(api_key=api_key)
+            self._api_key = api_key
             
-            # Test models in order of preference (best to fallback)
-            model_preference = [
-                ("gemini-1.5-pro", "Premium model (paid tier)"),
-                ("gemini-1.5-flash", "Fast model (free tier)"),
-                ("gemini-pro", "Legacy model (deprecated)")
+            # Pick from the (cached) model listing instead of test prompts;
+            # quota problems are handled when the model is first used
+            try:
+                available = list_available_models(api_key)
+            except Exception as list_error:
+                self.logger.warning(f"Could not list models, probing instead: {list_error}")
+                available = {}
+            
+            self._llm_candidates = [
+                (model_name, description) for model_name, description in MODEL_PREFERENCE
+                if "generateContent" in available.get(f"models/{model_name}", ())
             ]
+            if self._llm_candidates:
+                self._use_llm_candidate(0)
+                return True
             
             self.logger.info("Testing available models...")
             
-            for model_name, description in model_preference:
+            for model_name, description in MODEL_PREFERENCE:
                 try:
                     self.logger.info(f"Testing {model_name} - {description}")
                     
@@ -353,7 +1247,7 @@ class QueryProcessor:
                     self.llm = test_llm
                     self.config.generation_model = model_name
                     
-                    if "pro" in model_name and "flash" not in model_name:
+                    if self.config.tier is ModelTier.PREMIUM:
                         self.logger.info(f"✅ SUCCESS: Using premium model {model_name} - You have Pro access!")
                     else:
                         self.logger.info(f"✅ SUCCESS: Using {model_name} - {description}")
@@ -379,48 +1273,70 @@ class QueryProcessor:
             self.logger.error(f"Failed to initialize LLM: {e}")
             return False
     
+    def _use_llm_candidate(self, index: int):
+        """Switch to the index-th listed model"""
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        model_name, description = self._llm_candidates[index]
+        self.llm = ChatGoogleGenerativeAI(model=model_name, google_api_key=self._api_key)
+        self.config.generation_model = model_name
+        self._llm_index = index
+        self.logger.info(f"✅ Using {model_name} - {description}")
+    
+    def _invoke_llm(self, prompt: str) -> Any:
+        """Invoke the LLM, moving down the model list on quota/access errors"""
+        while True:
+            try:
+                return self.llm.invoke(prompt)
+            except Exception as e:
+                error_msg = str(e).lower()
+                retryable = any(s in error_msg for s in ("quota", "permission denied", "not found"))
+                next_index = self._llm_index + 1
+                if not retryable or next_index >= len(self._llm_candidates):
+                    raise
+                self.logger.warning(f"❌ {self.config.generation_model} failed ({e}) - trying next model")
+                self._use_llm_candidate(next_index)
+    
     def process_query(self, query: str, vector_db: Any) -> Dict[str, Any]:
         """Process user query and generate response"""
         try:
+            cached_result = self.cached_result(query)
+            if cached_result is not None:
+                self.logger.info("Returning cached answer for query")
+                return cached_result
+            
+            query_hash = _query_hash(query)
+            k = self.config.max_retrieved_docs
+            answer_key = ("answer", query_hash, k, self.config.generation_model)
+            
+            # A paraphrase of an earlier question reuses its answer
+            query_vector = self.embedding_cache.embed_query(query, vector_db.embeddings)
+            semantic_key = (k, self.config.generation_model)
+            similar_result = self.semantic_cache.get(query_vector, semantic_key, self.config.similarity_threshold)
+            if similar_result is not None:
+                self.logger.info("Returning cached answer for a similar query")
+                return similar_result
+            
             # Retrieve relevant documents
-            retrieved_docs = vector_db.similarity_search(query, k=self.config.max_retrieved_docs)
+            docs_key = ("docs", query_hash, k)
+            retrieved_docs = self.query_cache.get(docs_key)
+            if retrieved_docs is None:
+                retrieved_docs = self._mmr_search(vector_db, query_vector, k)
+                self.query_cache.put(docs_key, retrieved_docs)
             self.logger.info(f"Retrieved {len(retrieved_docs)} relevant documents for query")
             
             # Prepare context
-            structured_context = []
-            unique_sources = set()
-            
-            for i, doc in enumerate(retrieved_docs):
-                source_file = doc.metadata.get('source', 'Unknown Source')
-                page_num = doc.metadata.get('page_number', doc.metadata.get('page', 'Unknown'))
-                
-                context_id = f"CONTEXT_ITEM_{i+1}"
-                display_source = f"{source_file}"
-                if page_num != 'Unknown':
-                    display_source += f" (Page: {page_num})"
-                
-                structured_context.append(
-                    f"--- START {context_id}: Source File: {display_source} ---\n"
-                    f"{doc.page_content}\n"
-                    f"--- END {context_id} ---"
-                )
-                unique_sources.add(display_source)
-            
-            context_for_llm = "\n\n".join(structured_context)
-            source_list = "Full Source References:\n" + "\n".join(sorted(list(unique_sources)))
+            context_for_llm, unique_sources = self._build_context(retrieved_docs)
+            source_list = "Full Source References:\n" + "\n".join(unique_sources)
             
             # Generate response
             prompt = self._create_prompt(query, context_for_llm, source_list)
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(prompt)
             
-            return {
-                "success": True,
-                "answer": response.content,
-                "sources": list(unique_sources),
-                "retrieved_docs": retrieved_docs,  # Include full document objects
-                "context": context_for_llm,
-                "num_sources": len(retrieved_docs)
-            }
+            result = self._build_result(response.content, retrieved_docs, context_for_llm, unique_sources)
+            self.query_cache.put(answer_key, result)
+            self.semantic_cache.put(query_vector, semantic_key, result)
+            self.answer_cache.put(query_hash, k, self.config.generation_model, result["answer"], retrieved_docs)
+            return result
             
         except Exception as e:
             self.logger.error(f"Query processing failed: {e}")
@@ -430,33 +1346,113 @@ class QueryProcessor:
                 "answer": "Sorry, I couldn't process your query at this time."
             }
     
+    def cached_result(self, query: str) -> Optional[Dict[str, Any]]:
+        """Result of an earlier identical question on this database and model, if any"""
+        query_hash = _query_hash(query)
+        k = self.config.max_retrieved_docs
+        answer_key = ("answer", query_hash, k, self.config.generation_model)
+        
+        result = self.query_cache.get(answer_key)
+        if result is not None:
+            return result
+        
+        cached = self.answer_cache.get(query_hash, k, self.config.generation_model)
+        if cached is None:
+            return None
+        context_for_llm, unique_sources = self._build_context(cached["retrieved_docs"])
+        result = self._build_result(cached["answer"], cached["retrieved_docs"], context_for_llm, unique_sources)
+        self.query_cache.put(answer_key, result)
+        return result
+    
+    @staticmethod
+    def _build_context(retrieved_docs: List[Any]):
+        """LLM context text and the deduplicated display sources"""
+        display_sources = []
+        for doc in retrieved_docs:
+            get = doc.metadata.get
+            page_num = get('page_number', get('page', 'Unknown'))
+            display_source = f"{get('source', 'Unknown Source')}"
+            if page_num != 'Unknown':
+                display_source += f" (Page: {page_num})"
+            display_sources.append(display_source)
+        
+        context_for_llm = "\n\n".join(
+            CONTEXT_ITEM_TEMPLATE.format(index=i, source=display_source, content=doc.page_content)
+            for i, (doc, display_source) in enumerate(zip(retrieved_docs, display_sources), 1)
+        )
+        # Deduplicate while keeping retrieval (relevance) order
+        unique_sources = list(dict.fromkeys(display_sources))
+        return context_for_llm, unique_sources
+    
+    @staticmethod
+    def _build_result(answer: str, retrieved_docs: List[Any], context_for_llm: str,
+                      unique_sources: List[str]) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "answer": answer,
+            "sources": unique_sources,
+            "retrieved_docs": retrieved_docs,  # Include full document objects
+            "context": context_for_llm,
+            "num_sources": len(retrieved_docs)
+        }
+    
+    def invalidate_caches(self):
+        """Forget cached retrievals and answers after the database changed"""
+        self.query_cache.invalidate()
+        self.semantic_cache.invalidate()
+        self.answer_cache.clear()
+        self._vector_matrix = None
+    
+    @staticmethod
+    def _chroma_index_search(vector_db: Any, query_vector: List[float], fetch_k: int):
+        """Candidates and their vectors from Chroma's own index"""
+        from langchain_core.documents import Document
+        results = vector_db._collection.query(
+            query_embeddings=[query_vector],
+            n_results=fetch_k,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        candidates = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(results["documents"][0], results["metadatas"][0])
+        ]
+        return candidates, np.asarray(results["embeddings"][0], dtype=np.float32)
+    
+    def _chroma_matrix_search(self, vector_db: Any, query_vector: List[float], fetch_k: int):
+        """Candidates from the brute-force matrix, or None if there is none"""
+        from langchain_core.documents import Document
+        if self._vector_matrix is None:
+            self._vector_matrix = VectorMatrix.load(self.config.persist_directory) or False
+        if not self._vector_matrix or not len(self._vector_matrix.ids):
+            return None
+        
+        ids, vectors = self._vector_matrix.search(query_vector, fetch_k)
+        results = vector_db._collection.get(ids=ids, include=["documents", "metadatas"])
+        by_id = dict(zip(results["ids"], zip(results["documents"], results["metadatas"])))
+        if len(by_id) != len(ids):
+            self._vector_matrix = False  # Out of sync with the collection
+            return None
+        candidates = [Document(page_content=by_id[i][0], metadata=by_id[i][1] or {}) for i in ids]
+        return candidates, vectors
+    
+    def _mmr_search(self, vector_db: Any, query_vector: List[float], k: int) -> List[Any]:
+        """Fetch extra candidates and rerank them for diversity with MMR"""
+        fetch_k = k * self.config.mmr_fetch_factor
+        if isinstance(vector_db, tuple(VECTOR_STORES.values())):
+            candidates, vectors = vector_db.similarity_search_with_vectors(query_vector, fetch_k)
+        else:
+            candidates, vectors = (self._chroma_matrix_search(vector_db, query_vector, fetch_k)
+                                   or self._chroma_index_search(vector_db, query_vector, fetch_k))
+        
+        if len(candidates) <= k:
+            return candidates
+        
+        selected = _mmr_select(np.asarray(query_vector, dtype=np.float32), vectors, k, self.config.mmr_lambda)
+        return [candidates[i] for i in selected]
+    
     def _create_prompt(self, query: str, context: str, sources: str) -> str:
         """Create enhanced prompt for Gemini"""
-        return f"""
-You are an AI assistant specialized in scientific document analysis. Your task is to answer the user's question STRICTLY by referencing the provided document excerpts.
-
-**CRITICAL INSTRUCTIONS:**
-1. For EVERY piece of information you provide, you MUST identify its source
-2. Format your answer with explicit source attribution
-3. Include direct quotes or very close paraphrases from the source material
-4. If information is not present in the provided context, clearly state that
-
-**Desired Format:**
-Start with a brief overview, then for each specific point:
-- State the source: "According to [filename] (Page: X)..."
-- Include the relevant information: "The document states: '[quote or paraphrase]'"
-- Continue with additional sources as needed
-
-**Context Information:**
-{context}
-
----
-**User Question:** {query}
-
-Please provide a comprehensive, well-attributed answer based ONLY on the provided context.
-
-{sources}
-"""
+        return "".join((PROMPT_PREFIX, context, PROMPT_QUERY_HEADER, query, PROMPT_SUFFIX, sources, "\n"))
 
 class ScientificRAGApp:
     """Main Relevantr GUI application"""
@@ -470,11 +1466,20 @@ class ScientificRAGApp:
         self.root = tk.Tk()
         self.api_key = None
         self.is_processing = False
+        # Reused for every question instead of a new thread per click
+        self._query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+        # (monotonic time, stats) of the last database stats lookup
+        self._stats_cache = (0.0, None)
+        # (method name, args) posted by worker threads, run on the Tk thread
+        self._ui_queue = queue.Queue()
         
         # Initialize variables for export functionality
         self._last_query_result = None
         self._last_query = None
         
+        # Built with the main panels, after the window is shown
+        self.source_content_text = None
+        
         self.setup_gui()
     
     def setup_gui(self):
@@ -483,14 +1488,39 @@ class ScientificRAGApp:
         self.root.geometry(f"{self.config.window_width}x{self.config.window_height}")
         self.root.minsize(800, 600)
         
-        # Create main frames
+        # Create the light widgets now; the main panels are built once the
+        # window is on screen so startup is not blocked on them
         self.create_menu()
         self.create_toolbar()
-        self.create_main_frames()
+        self.main_panel = ttk.Frame(self.root)
+        self.main_panel.pack(fill=tk.BOTH, expand=True)
         self.create_status_bar()
+        self._main_frames_built = False
+        self.root.after_idle(self.create_main_frames)
         
         # Initialize with API key prompt
         self.root.after(100, self.prompt_api_key)
+        self.root.after(50, self._drain_ui_queue)
+    
+    def _drain_ui_queue(self):
+        """Run the UI updates posted by worker threads, then poll again"""
+        pending = []
+        while True:
+            try:
+                pending.append(self._ui_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        for i, (name, args) in enumerate(pending):
+            # Only the latest of consecutive progress updates is visible anyway
+            if name == "update_progress" and i + 1 < len(pending) and pending[i + 1][0] == name:
+                continue
+            try:
+                getattr(self, name)(*args)
+            except Exception as e:
+                self.logger.error(f"UI update {name} failed: {e}")
+        
+        self.root.after(50, self._drain_ui_queue)
     
     def create_menu(self):
         """Create application menu"""
@@ -540,10 +1570,28 @@ class ScientificRAGApp:
         self.db_status_var = tk.StringVar(value="Database: Not Ready")
         ttk.Label(self.toolbar, textvariable=self.db_status_var).pack(side=tk.RIGHT, padx=10)
     
+    def create_text_area(self, parent, fill=tk.BOTH, expand=True, **options) -> tk.Text:
+        """Text widget with a vertical scrollbar, packed into parent"""
+        container = ttk.Frame(parent)
+        container.pack(fill=fill, expand=expand, padx=5, pady=5)
+        
+        text = tk.Text(container, wrap=tk.WORD, **options)
+        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        text.scrollbar = scrollbar
+        
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        return text
+    
     def create_main_frames(self):
         """Create main application frames"""
+        if self._main_frames_built:
+            return
+        self._main_frames_built = True
+        
         # Main container
-        main_container = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        main_container = ttk.PanedWindow(self.main_panel, orient=tk.HORIZONTAL)
         main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Left panel - Query and Results
@@ -554,8 +1602,7 @@ class ScientificRAGApp:
         query_frame = ttk.LabelFrame(left_frame, text="Ask a Question")
         query_frame.pack(fill=tk.X, pady=(0, 5))
         
-        self.query_text = scrolledtext.ScrolledText(query_frame, height=3, wrap=tk.WORD, font=("Arial", 12))
-        self.query_text.pack(fill=tk.X, padx=5, pady=5)
+        self.query_text = self.create_text_area(query_frame, fill=tk.X, expand=False, height=3, font=("Arial", 12))
         
         query_btn_frame = ttk.Frame(query_frame)
         query_btn_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
@@ -568,8 +1615,7 @@ class ScientificRAGApp:
         results_frame = ttk.LabelFrame(left_frame, text="Answer")
         results_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.results_text = scrolledtext.ScrolledText(results_frame, wrap=tk.WORD, font=("Arial", 12))
-        self.results_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.results_text = self.create_text_area(results_frame, font=("Arial", 12))
         
         # Right panel - Sources and Logs
         right_frame = ttk.Frame(main_container)
@@ -607,8 +1653,10 @@ class ScientificRAGApp:
         content_frame = ttk.LabelFrame(right_frame, text="Source Content (Double-click source to view)")
         content_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
         
-        self.source_content_text = scrolledtext.ScrolledText(content_frame, wrap=tk.WORD, font=("Arial", 11), height=10)
-        self.source_content_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.source_content_text = self.create_text_area(content_frame, font=("Arial", 11), height=10)
+        # Per-passage Text widgets shown in its place; see show_source_view
+        self._source_views = OrderedDict()
+        self._visible_source_view = self.source_content_text
         
         # Progress and logs
         progress_frame = ttk.LabelFrame(right_frame, text="Progress")
@@ -639,7 +1687,11 @@ class ScientificRAGApp:
     
     def prompt_api_key(self):
         """Prompt user for Google API key"""
+        # set_api_key touches the query widgets
+        self.create_main_frames()
+        
         # Try to load from .env first (check current working directory)
+        from dotenv import load_dotenv
         env_path = os.path.join(os.getcwd(), '.env')
         if os.path.exists(env_path):
             load_dotenv(env_path)
@@ -648,9 +1700,13 @@ class ScientificRAGApp:
             
         api_key = os.getenv("GOOGLE_API_KEY")
         
-        if not api_key:
-            api_key = self.get_api_key_from_user()
-        
+        if api_key:
+            self.set_api_key(api_key)
+        else:
+            self.get_api_key_from_user(self.on_prompted_api_key)
+    
+    def on_prompted_api_key(self, api_key: Optional[str]):
+        """Handle the startup API key dialog result"""
         if api_key:
             self.set_api_key(api_key)
         else:
@@ -658,8 +1714,11 @@ class ScientificRAGApp:
                                  "Google API key is required to use this application. "
                                  "Please configure it in Settings menu.")
     
-    def get_api_key_from_user(self):
-        """Get API key from user input"""
+    def get_api_key_from_user(self, on_result):
+        """Ask for the API key and pass it (or None) to on_result.
+        
+        Returns immediately; the mainloop keeps running while the dialog is open.
+        """
         dialog = tk.Toplevel(self.root)
         dialog.title("Google API Key Required")
         dialog.geometry("400x200")
@@ -673,20 +1732,18 @@ class ScientificRAGApp:
         entry.pack(pady=5)
         entry.focus()
         
-        result = {"api_key": None}
-        
         def on_ok():
-            result["api_key"] = api_key_var.get().strip()
+            api_key = api_key_var.get().strip()
             dialog.destroy()
+            on_result(api_key or None)
         
         def on_cancel():
             dialog.destroy()
+            on_result(None)
         
         ttk.Button(dialog, text="OK", command=on_ok).pack(side=tk.LEFT, padx=20, pady=20)
         ttk.Button(dialog, text="Cancel", command=on_cancel).pack(side=tk.RIGHT, padx=20, pady=20)
-        
-        dialog.wait_window()
-        return result["api_key"]
+        dialog.protocol("WM_DELETE_WINDOW", on_cancel)
     
     def set_api_key(self, api_key: str):
         """Set and validate API key"""
@@ -701,7 +1758,7 @@ class ScientificRAGApp:
             
             # Show which model is being used
             model_name = self.config.generation_model
-            if "pro" in model_name and "flash" not in model_name:
+            if self.config.tier is ModelTier.PREMIUM:
                 self.model_status_var.set(f"Model: {model_name} (Premium)")
                 self.status_var.set("Ready - Using premium model with Pro access!")
             else:
@@ -710,6 +1767,7 @@ class ScientificRAGApp:
             
             # Try to load existing database
             if self.processor.load_existing_database():
+                self._stats_cache = (0.0, None)
                 self.update_database_status()
                 # Force enable query interface
                 self.ask_btn.config(state='normal')
@@ -747,23 +1805,18 @@ class ScientificRAGApp:
         self.process_btn.config(state='disabled')
         
         def progress_callback(current, total, message):
-            self.root.after(0, lambda: self.update_progress(current, total, message))
+            self._ui_queue.put(("update_progress", (current, total, message)))
         
         def process_thread():
             try:
-                # Process PDFs
-                documents = self.processor.load_and_process_pdfs(pdf_directory, progress_callback)
+                # Parse, embed and store PDFs; embedding starts while later files are still parsing
+                doc_count = self.processor.ingest_pdfs(pdf_directory, progress_callback)
+                self.query_processor.invalidate_caches()
                 
-                if documents:
-                    # Create database
-                    success = self.processor.create_vector_database(documents, progress_callback)
-                    
-                    self.root.after(0, lambda: self.on_processing_complete(success, len(documents)))
-                else:
-                    self.root.after(0, lambda: self.on_processing_error("No documents were processed"))
+                self._ui_queue.put(("on_processing_complete", (True, doc_count)))
                     
             except Exception as e:
-                self.root.after(0, lambda: self.on_processing_error(str(e)))
+                self._ui_queue.put(("on_processing_error", (str(e),)))
         
         threading.Thread(target=process_thread, daemon=True).start()
     
@@ -783,6 +1836,7 @@ class ScientificRAGApp:
         
         if success:
             # Force update database status to enable query interface
+            self._stats_cache = (0.0, None)
             self.update_database_status()
             self.progress_var.set(f"Complete - Processed {doc_count} document chunks")
             self.status_var.set("Ready - Database updated successfully")
@@ -810,7 +1864,11 @@ class ScientificRAGApp:
     
     def update_database_status(self):
         """Update database status display"""
+        checked_at, stats = self._stats_cache
+        if stats is not None and time.monotonic() - checked_at < 2.0:
+            return  # Display already reflects these stats
         stats = self.processor.get_database_stats()
+        self._stats_cache = (time.monotonic(), stats)
         self.logger.info(f"Database status check: {stats}")
         
         if stats["status"] == "ready":
@@ -835,30 +1893,36 @@ class ScientificRAGApp:
             messagebox.showerror("Error", "Database not ready. Please process PDFs first.")
             return
         
+        # Kept for export; display_results does not read the widget again
+        self._last_query = query
+        
+        # Repeated questions are answered without a worker thread or API call
+        cached_result = self.query_processor.cached_result(query)
+        if cached_result is not None:
+            self.clear_sources()
+            self.display_results(cached_result)
+            return
+        
         self.ask_btn.config(state='disabled')
-        self.results_text.delete(1.0, tk.END)
+        self.results_text.replace('1.0', tk.END, "Processing your question...\n")
         self.clear_sources()
         
-        self.results_text.insert(tk.END, "Processing your question...\n")
         self.root.update_idletasks()
         
         def query_thread():
             result = self.query_processor.process_query(query, self.processor.vector_db)
-            self.root.after(0, lambda: self.display_results(result))
+            self._ui_queue.put(("display_results", (result,)))
         
-        threading.Thread(target=query_thread, daemon=True).start()
+        self._query_pool.submit(query_thread)
     
     def display_results(self, result: Dict[str, Any]):
         """Display query results"""
-        self.results_text.delete(1.0, tk.END)
-        
         # Store result for export and source display
         self._last_query_result = result
-        self._last_query = self.query_text.get(1.0, tk.END).strip()
         
         if result["success"]:
             # Display answer
-            self.results_text.insert(tk.END, result["answer"])
+            self.results_text.replace('1.0', tk.END, result["answer"])
             
             # Display sources with individual passages
             if "retrieved_docs" in result:
@@ -869,7 +1933,7 @@ class ScientificRAGApp:
             
             self.status_var.set(f"Query complete - Found {result.get('num_sources', 0)} relevant sources")
         else:
-            self.results_text.insert(tk.END, f"Error: {result.get('error', 'Unknown error')}")
+            self.results_text.replace('1.0', tk.END, f"Error: {result.get('error', 'Unknown error')}")
             self.status_var.set("Query failed")
         
         self.ask_btn.config(state='normal')
@@ -878,22 +1942,18 @@ class ScientificRAGApp:
         """Display sources with individual text passages"""
         self.clear_sources()
         
+        rows = []
         for i, doc in enumerate(retrieved_docs):
-            source_file = doc.metadata.get('source', 'Unknown Source')
-            page_num = doc.metadata.get('page_number', doc.metadata.get('page', 'Unknown'))
-            
-            # Create a unique identifier for each passage
-            passage_id = f"Passage {i+1}"
+            get = doc.metadata.get
+            source_file = get('source', 'Unknown Source')
+            page_num = get('page_number', get('page', 'Unknown'))
             
-            # Insert individual source entry
-            item_id = self.sources_tree.insert("", tk.END, 
-                                              text=passage_id, 
-                                              values=(source_file, page_num),
-                                              tags=(str(i),))  # Store index as tag for retrieval
+            # Passage label, (file, page) and the index as tag for retrieval
+            rows.append((f"Passage {i+1}", (source_file, page_num), str(i)))
+        self.insert_source_rows(rows)
         
         # Clear source content display
-        self.source_content_text.delete(1.0, tk.END)
-        self.source_content_text.insert(tk.END, "Double-click on a source above to view its content...")
+        self.source_content_text.replace('1.0', tk.END, "Double-click on a source above to view its content...")
     
     def show_source_content(self, event):
         """Show the content of the selected source passage"""
@@ -912,56 +1972,82 @@ class ScientificRAGApp:
             retrieved_docs = self._last_query_result.get("retrieved_docs", [])
             
             if doc_index < len(retrieved_docs):
-                doc = retrieved_docs[doc_index]
-                source_file = doc.metadata.get('source', 'Unknown Source')
-                page_num = doc.metadata.get('page_number', doc.metadata.get('page', 'Unknown'))
-                content = doc.page_content
-                
-                # Display the source content
-                self.source_content_text.delete(1.0, tk.END)
-                
-                # Add header with source information
-                header = f"Source: {source_file}\n"
-                if page_num != 'Unknown':
-                    header += f"Page: {page_num}\n"
-                header += "=" * 50 + "\n\n"
-                
-                self.source_content_text.insert(tk.END, header)
-                self.source_content_text.insert(tk.END, content)
-                
-                # Highlight the header
-                self.source_content_text.tag_add("header", "1.0", "4.0")
-                self.source_content_text.tag_config("header", font=("Arial", 10, "bold"), foreground="blue")
+                # A passage viewed before is shown again without copying its text
+                view = self._source_views.get(doc_index)
+                if view is None:
+                    view = self.create_source_view(retrieved_docs[doc_index])
+                    self._source_views[doc_index] = view
+                    while len(self._source_views) > SOURCE_VIEW_CACHE_SIZE:
+                        self._source_views.popitem(last=False)[1].destroy()
+                else:
+                    self._source_views.move_to_end(doc_index)
+                self.show_source_view(view)
                 
         except (ValueError, IndexError) as e:
             self.logger.error(f"Error displaying source content: {e}")
-            self.source_content_text.delete(1.0, tk.END)
-            self.source_content_text.insert(tk.END, "Error loading source content.")
+            self.show_source_view(self.source_content_text)
+            self.source_content_text.replace('1.0', tk.END, "Error loading source content.")
+    
+    def create_source_view(self, doc: Any) -> tk.Text:
+        """Unpacked Text widget holding one passage, next to source_content_text"""
+        get = doc.metadata.get
+        source_file = get('source', 'Unknown Source')
+        page_num = get('page_number', get('page', 'Unknown'))
+        
+        # Add header with source information
+        header = f"Source: {source_file}\n"
+        if page_num != 'Unknown':
+            header += f"Page: {page_num}\n"
+        header += "=" * 50 + "\n\n"
+        
+        view = tk.Text(self.source_content_text.master, wrap=tk.WORD, font=("Arial", 11), height=10,
+                       yscrollcommand=self.source_content_text.scrollbar.set)
+        view.insert('1.0', header + doc.page_content)
+        
+        # Highlight the header
+        view.tag_add("header", "1.0", f"1.0 + {len(header)}c")
+        view.tag_config("header", font=("Arial", 10, "bold"), foreground="blue")
+        return view
+    
+    def show_source_view(self, view: tk.Text):
+        """Swap view into the source content pane"""
+        if view is self._visible_source_view:
+            return
+        self._visible_source_view.pack_forget()
+        view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.source_content_text.scrollbar.configure(command=view.yview)
+        self._visible_source_view = view
     
     def display_sources(self, sources: List[str]):
         """Display sources in the tree view"""
         self.clear_sources()
         
+        rows = []
         for i, source in enumerate(sources):
             # Parse source string to extract filename and page
-            if " (Page: " in source:
-                filename, page_part = source.rsplit(" (Page: ", 1)
-                page = page_part.rstrip(")")
-            else:
-                filename = source
-                page = "Unknown"
+            match = SOURCE_PAGE_RE.match(source)
+            filename, page = match.groups() if match else (source, "Unknown")
             
-            self.sources_tree.insert("", tk.END, text=f"Source {i+1}", values=(filename, page))
+            rows.append((f"Source {i+1}", (filename, page), ""))
+        self.insert_source_rows(rows)
+    
+    def insert_source_rows(self, rows: List[tuple]):
+        """Insert (text, values, tag) rows into the sources tree with one Tcl call"""
+        # A Python loop of Treeview.insert calls costs one Tcl round trip per
+        # row; the rows are passed as a single Tcl list and inserted by a Tcl loop
+        self.sources_tree.tk.call('apply', SOURCE_ROWS_TCL, str(self.sources_tree), tuple(rows))
     
     def clear_sources(self):
         """Clear sources tree and content display"""
-        for item in self.sources_tree.get_children():
-            self.sources_tree.delete(item)
+        self.sources_tree.delete(*self.sources_tree.get_children())
         
         # Clear source content display if it exists
-        if hasattr(self, 'source_content_text'):
-            self.source_content_text.delete(1.0, tk.END)
-            self.source_content_text.insert(tk.END, "Double-click on a source above to view its content...")
+        if self.source_content_text is not None:
+            self.show_source_view(self.source_content_text)
+            for view in self._source_views.values():
+                view.destroy()
+            self._source_views.clear()
+            self.source_content_text.replace('1.0', tk.END, "Double-click on a source above to view its content...")
     
     def clear_query(self):
         """Clear query text"""
@@ -971,11 +2057,12 @@ class ScientificRAGApp:
         """Reset the vector database"""
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset the database? This will delete all processed data."):
             try:
-                import shutil
                 if os.path.exists(self.config.persist_directory):
-                    shutil.rmtree(self.config.persist_directory)
+                    _fast_rmtree(self.config.persist_directory)
                 
                 self.processor.vector_db = None
+                self.query_processor.invalidate_caches()
+                self._stats_cache = (0.0, None)
                 self.update_database_status()
                 self.status_var.set("Database reset - Please process PDFs to create new database")
                 messagebox.showinfo("Success", "Database reset successfully.")
@@ -984,20 +2071,19 @@ class ScientificRAGApp:
     
     def configure_api_key(self):
         """Configure API key"""
-        api_key = self.get_api_key_from_user()
-        if api_key:
-            self.set_api_key(api_key)
+        self.get_api_key_from_user(lambda api_key: api_key and self.set_api_key(api_key))
     
     def show_advanced_settings(self):
         """Show advanced settings dialog"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Advanced Settings")
-        dialog.geometry("400x300")
+        dialog.geometry("400x360")
         dialog.transient(self.root)
         dialog.grab_set()
         
         # Settings variables
         chunk_size_var = tk.IntVar(value=self.config.chunk_size)
+        similarity_threshold_var = tk.DoubleVar(value=self.config.similarity_threshold)
         chunk_overlap_var = tk.IntVar(value=self.config.chunk_overlap)
         max_docs_var = tk.IntVar(value=self.config.max_retrieved_docs)
         
@@ -1005,6 +2091,9 @@ class ScientificRAGApp:
         ttk.Label(dialog, text="Chunk Size:").pack(pady=5)
         ttk.Entry(dialog, textvariable=chunk_size_var).pack(pady=2)
         
+        ttk.Label(dialog, text="Similar Question Threshold (cosine, >1 disables):").pack(pady=5)
+        ttk.Entry(dialog, textvariable=similarity_threshold_var).pack(pady=2)
+        
         ttk.Label(dialog, text="Chunk Overlap:").pack(pady=5)
         ttk.Entry(dialog, textvariable=chunk_overlap_var).pack(pady=2)
         
@@ -1013,17 +2102,10 @@ class ScientificRAGApp:
         
         def apply_settings():
             self.config.chunk_size = chunk_size_var.get()
+            self.config.similarity_threshold = similarity_threshold_var.get()
             self.config.chunk_overlap = chunk_overlap_var.get()
             self.config.max_retrieved_docs = max_docs_var.get()
             
-            # Recreate text splitter with new settings
-            self.processor.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=self.config.chunk_size,
-                chunk_overlap=self.config.chunk_overlap,
-                length_function=len,
-                is_separator_regex=False,
-            )
-            
             dialog.destroy()
             messagebox.showinfo("Settings Applied", "Settings updated successfully. You may need to reprocess PDFs for changes to take effect.")
         
@@ -1043,30 +2125,36 @@ class ScientificRAGApp:
         
         if filename:
             try:
+                # Build the report in memory and write it with a single call
+                buf = io.StringIO()
+                write = buf.write
+                write(f"Relevantr - Scientific PDF RAG Application\n")
+                write(f"Query Results Report\n")
+                write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                write("=" * 50 + "\n\n")
+                
+                write(f"Query: {self._last_query}\n\n")
+                write(f"Answer:\n{self._last_query_result.get('answer', '')}\n\n")
+                
+                if 'retrieved_docs' in self._last_query_result:
+                    write("Detailed Sources with Content:\n")
+                    separator = '-' * 40
+                    for i, doc in enumerate(self._last_query_result['retrieved_docs'], 1):
+                        get = doc.metadata.get
+                        source_file = get('source', 'Unknown Source')
+                        page_num = get('page_number', get('page', 'Unknown'))
+                        
+                        write(f"\n{i}. {source_file}")
+                        if page_num != 'Unknown':
+                            write(f" (Page: {page_num})")
+                        write(f"\n{separator}\n{doc.page_content}\n")
+                elif 'sources' in self._last_query_result:
+                    write("Sources:\n")
+                    for i, source in enumerate(self._last_query_result['sources'], 1):
+                        write(f"{i}. {source}\n")
+                
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(f"Relevantr - Scientific PDF RAG Application\n")
-                    f.write(f"Query Results Report\n")
-                    f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("=" * 50 + "\n\n")
-                    
-                    f.write(f"Query: {self._last_query}\n\n")
-                    f.write(f"Answer:\n{self._last_query_result.get('answer', '')}\n\n")
-                    
-                    if 'retrieved_docs' in self._last_query_result:
-                        f.write("Detailed Sources with Content:\n")
-                        for i, doc in enumerate(self._last_query_result['retrieved_docs'], 1):
-                            source_file = doc.metadata.get('source', 'Unknown Source')
-                            page_num = doc.metadata.get('page_number', doc.metadata.get('page', 'Unknown'))
-                            
-                            f.write(f"\n{i}. {source_file}")
-                            if page_num != 'Unknown':
-                                f.write(f" (Page: {page_num})")
-                            f.write(f"\n{'-' * 40}\n")
-                            f.write(f"{doc.page_content}\n")
-                    elif 'sources' in self._last_query_result:
-                        f.write("Sources:\n")
-                        for i, source in enumerate(self._last_query_result['sources'], 1):
-                            f.write(f"{i}. {source}\n")
+                    f.write(buf.getvalue())
                 
                 messagebox.showinfo("Success", f"Results exported to {filename}")
                 
@@ -1076,8 +2164,9 @@ class ScientificRAGApp:
     def show_about(self):
         """Show about information in the main results window"""
         # Get current model info
-        current_model = getattr(self.config, 'generation_model', 'Not configured')
-        is_premium = "pro" in current_model.lower() and "flash" not in current_model.lower()
+        current_model = self.config.generation_model
+        is_premium = self.config.tier is ModelTier.PREMIUM
+        model_info = self.config.tier.label
         
         about_text = f"""
 🔬 RELEVANTR - Scientific PDF RAG Application 📚
@@ -1129,17 +2218,14 @@ For more information, visit: https://github.com/biterik/Relevantr
 """
         
         # Clear the results window and show about info
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, about_text)
+        self.results_text.replace('1.0', tk.END, about_text)
         
         # Clear sources panel
         self.clear_sources()
-        if hasattr(self, 'source_content_text'):
-            self.source_content_text.delete(1.0, tk.END)
-            self.source_content_text.insert(tk.END, "About information displayed in main window.")
+        if self.source_content_text is not None:
+            self.source_content_text.replace('1.0', tk.END, "About information displayed in main window.")
         
         # Update status
-        model_info = f"Premium model" if is_premium else "Free tier model"
         self.status_var.set(f"About displayed - Using {current_model} ({model_info}) - Ask a question to return to normal mode")
     
     def force_enable_query(self):
@@ -1160,6 +2246,7 @@ For more information, visit: https://github.com/biterik/Relevantr
             self.logger.error(f"Relevantr application error: {e}")
             messagebox.showerror("Application Error", f"An unexpected error occurred: {e}")
         finally:
+            self._query_pool.shutdown(wait=False, cancel_futures=True)
             self.logger.info("Relevantr closing")
 
 
@@ -1169,8 +2256,10 @@ def main():
         # Check dependencies
         required_packages = [
             ('tkinter', 'tk'),
+            ('numpy', 'numpy'),
             ('google.generativeai', 'google-generativeai'), 
             ('langchain', 'langchain'), 
+            ('langchain_core', 'langchain-core'),
             ('langchain_community', 'langchain-community'),
             ('langchain_google_genai', 'langchain-google-genai'),
             ('chromadb', 'chromadb'),
@@ -1180,9 +2269,11 @@ def main():
         
         missing_packages = []
         for import_name, install_name in required_packages:
+            # find_spec locates a package without running its (slow) import
             try:
-                __import__(import_name)
-            except ImportError:
+                if importlib.util.find_spec(import_name) is None:
+                    missing_packages.append(install_name)
+            except ImportError:  # Parent package missing
                 missing_packages.append(install_name)
         
         if missing_packages:
@@ -1190,8 +2281,8 @@ def main():
             print("\nUsing pip:")
             print("pip install " + " ".join(missing_packages))
             print("\nUsing conda:")
-            conda_packages = [p for p in missing_packages if p in ['tqdm', 'python-dotenv']]
-            pip_packages = [p for p in missing_packages if p not in ['tqdm', 'python-dotenv']]
+            conda_packages = [p for p in missing_packages if p in ['numpy', 'tqdm', 'python-dotenv']]
+            pip_packages = [p for p in missing_packages if p not in ['numpy', 'tqdm', 'python-dotenv']]
             
             if conda_packages:
                 print("conda install -c conda-forge " + " ".join(conda_packages))
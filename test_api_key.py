@@ -3,8 +3,6 @@
 Test script to verify Google Gemini API key is working
 """
 
-import os
-
 def test_api_key():
     """Test the Google Gemini API key"""
     print("Testing Google Gemini API Key...")
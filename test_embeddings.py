@@ -4,6 +4,7 @@ Test script to verify Google embeddings work with explicit API key
 """
 
 import os
+import numpy as np
 import google.generativeai as genai
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
@@ -32,18 +33,14 @@ def test_embeddings():
             google_api_key=api_key
         )
         
-        # Test embedding a simple query
-        print("Testing embedding generation...")
-        test_embedding = embeddings.embed_query("This is a test")
+        # Test embedding generation and batching with a single request
+        print("Testing batch embedding generation...")
+        docs = ["This is a test", "Document 1", "Document 2", "Document 3"]
+        all_vecs = np.asarray(embeddings.embed_documents(docs), dtype=np.float32)
+        assert all_vecs.shape == (len(docs), 768), f"unexpected embedding shape {all_vecs.shape}"
         
-        print(f"✅ Embeddings working! Vector length: {len(test_embedding)}")
-        
-        # Test embedding multiple documents
-        print("Testing batch embeddings...")
-        docs = ["Document 1", "Document 2", "Document 3"]
-        doc_embeddings = embeddings.embed_documents(docs)
-        
-        print(f"✅ Batch embeddings working! Generated {len(doc_embeddings)} vectors")
+        print(f"✅ Embeddings working! Vector length: {all_vecs.shape[1]}")
+        print(f"✅ Batch embeddings working! Generated {len(all_vecs)} vectors ({all_vecs.nbytes} bytes as float32)")
         
         return True
         
@@ -5,72 +5,77 @@ Run this in your environment to check for missing dependencies
 """
 
 import sys
+from importlib.util import find_spec
 print(f"Testing imports with Python {sys.version}")
 print("=" * 50)
 
 def test_import(module_name, description=""):
-    """Test importing a module"""
+    """Test that a module can be found, without executing its import"""
     try:
-        __import__(module_name)
+        found = find_spec(module_name) is not None
+        error = "module not found"
+    except (ImportError, ValueError) as e:  # Parent package missing, or no spec
+        found = False
+        error = e
+    
+    if found:
         print(f"[OK] {module_name} - {description}")
-        return True
-    except ImportError as e:
-        print(f"[FAIL] {module_name} - {e}")
-        return False
+    else:
+        print(f"[FAIL] {module_name} - {error}")
+    return module_name, found
 
-def main():
-    """Test all critical imports"""
-    success_count = 0
-    total_tests = 0
-    
+# (module, description) probes, shared by any driver that imports them
+_TESTS = (
     # Test basic Python modules
-    tests = [
-        ("tkinter", "GUI framework"),
-        ("tkinter.ttk", "Themed widgets"),
-        ("tkinter.filedialog", "File dialogs"),
-        ("tkinter.messagebox", "Message boxes"),
-        ("tkinter.scrolledtext", "Scrolled text widgets"),
-        
-        # Test Google AI modules
-        ("google", "Google namespace package"),
-        ("google.generativeai", "Google Gemini AI"),
-        
-        # Test LangChain modules
-        ("langchain", "LangChain framework"),
-        ("langchain.text_splitter", "Text processing"),
-        ("langchain_community", "Community extensions"),
-        ("langchain_community.document_loaders", "Document loaders"),
-        ("langchain_community.vectorstores", "Vector databases"),
-        ("langchain_google_genai", "Google AI integration"),
-        
-        # Test ChromaDB
-        ("chromadb", "Vector database"),
-        
-        # Test PDF processing
-        ("fitz", "PyMuPDF PDF processing"),
-        
-        # Test utilities
-        ("tqdm", "Progress bars"),
-        ("dotenv", "Environment variables"),
-        ("warnings", "Warning system"),
-        ("logging", "Logging system"),
-        ("threading", "Threading support"),
-        ("json", "JSON processing"),
-        ("datetime", "Date/time handling"),
-        ("dataclasses", "Data classes"),
-        ("typing", "Type hints"),
-        ("pathlib", "Path handling"),
-        ("sqlite3", "SQLite database"),
-        ("ssl", "SSL/TLS support"),
-        ("certifi", "Certificate bundle"),
-        ("urllib3", "HTTP client"),
-        ("requests", "HTTP requests"),
-    ]
+    ("tkinter", "GUI framework"),
+    ("tkinter.ttk", "Themed widgets"),
+    ("tkinter.filedialog", "File dialogs"),
+    ("tkinter.messagebox", "Message boxes"),
+    ("tkinter.scrolledtext", "Scrolled text widgets"),
+    
+    # Test Google AI modules
+    ("google", "Google namespace package"),
+    ("google.generativeai", "Google Gemini AI"),
+    
+    # Test LangChain modules
+    ("langchain", "LangChain framework"),
+    ("langchain.text_splitter", "Text processing"),
+    ("langchain_community", "Community extensions"),
+    ("langchain_community.document_loaders", "Document loaders"),
+    ("langchain_community.vectorstores", "Vector databases"),
+    ("langchain_google_genai", "Google AI integration"),
+    
+    # Test ChromaDB
+    ("chromadb", "Vector database"),
     
-    for module, desc in tests:
-        total_tests += 1
-        if test_import(module, desc):
-            success_count += 1
+    # Test PDF processing
+    ("fitz", "PyMuPDF PDF processing"),
+    
+    # Test utilities
+    ("tqdm", "Progress bars"),
+    ("dotenv", "Environment variables"),
+    ("warnings", "Warning system"),
+    ("logging", "Logging system"),
+    ("threading", "Threading support"),
+    ("json", "JSON processing"),
+    ("datetime", "Date/time handling"),
+    ("dataclasses", "Data classes"),
+    ("typing", "Type hints"),
+    ("pathlib", "Path handling"),
+    ("sqlite3", "SQLite database"),
+    ("ssl", "SSL/TLS support"),
+    ("certifi", "Certificate bundle"),
+    ("urllib3", "HTTP client"),
+    ("requests", "HTTP requests"),
+)
+
+def main():
+    """Test all critical imports"""
+    # Single pass; failures are collected from the same results
+    results = [test_import(module, desc) for module, desc in _TESTS]
+    failed_modules = [module for module, ok in results if not ok]
+    total_tests = len(results)
+    success_count = total_tests - len(failed_modules)
     
     print("=" * 50)
     print(f"Results: {success_count}/{total_tests} imports successful")
@@ -80,12 +85,6 @@ def main():
         return True
     else:
         print("[WARNING] Some imports failed. Install missing packages:")
-        failed_modules = []
-        for module, _ in tests:
-            try:
-                __import__(module)
-            except ImportError:
-                failed_modules.append(module)
         
         print("\nTo install missing packages:")
         if 'google.generativeai' in failed_modules:
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script to verify a query runs through QueryProcessor.process_query
+without network access (stub embeddings, vector store and LLM)
+"""
+
+import logging
+import tempfile
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import BaseModel
+
+from relevantr import Config, QueryProcessor
+
+class StubEmbeddings(BaseModel):
+    """Stands in for GoogleGenerativeAIEmbeddings, which is an (unhashable) pydantic model"""
+    model: str = "models/text-embedding-004"
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text)), 1.0, 0.0]
+
+class StubCollection:
+    def query(self, query_embeddings, n_results, include):
+        texts = [f"Passage {i}" for i in range(3)]
+        return {
+            "documents": [texts],
+            "metadatas": [[{"source": "paper.pdf", "page_number": i} for i in range(3)]],
+            "embeddings": [[[1.0, float(i), 0.0] for i in range(3)]],
+        }
+
+class StubLLM:
+    def invoke(self, prompt: str):
+        return SimpleNamespace(content="Stub answer")
+
+def test_process_query():
+    """Run one question through process_query and check it is answered"""
+    print("Testing QueryProcessor.process_query...")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        config = Config(persist_directory=persist_directory, max_retrieved_docs=2)
+        processor = QueryProcessor(config, logging.getLogger(__name__))
+        processor.llm = StubLLM()
+        vector_db = SimpleNamespace(embeddings=StubEmbeddings(), _collection=StubCollection())
+
+        result = processor.process_query("What does the paper say?", vector_db)
+        assert result["success"], f"query failed: {result.get('error')}"
+        assert result["answer"] == "Stub answer"
+        assert result["num_sources"] == 2
+        print(f"✅ Query answered from {result['num_sources']} passages")
+
+        # A second, identical question is served from the caches
+        processor.llm = None
+        repeat = processor.process_query("What does the paper say?", vector_db)
+        assert repeat["success"] and repeat["answer"] == "Stub answer"
+        print("✅ Repeated query answered from cache")
+
+    return True
+
+if __name__ == "__main__":
+    test_process_query()